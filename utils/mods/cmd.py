@@ -13,10 +13,31 @@ from typed import typed, Str, Union, Maybe, List, Bool, Nill, Any, Pattern, Int,
 from utils.mods.path import path, Path, File, Exists, Dir
 from utils.mods.file import file
 from utils.mods.envs import Env
-from utils.mods.number import Pos, Nat
+from utils.mods.number import Num, Pos, Nat
+from utils.mods.helper.cmd import _run_async, _gather_ordered, _gather_completed, _Stream
 
 class CmdErr(Exception): pass
 
+def _prepare(cmd, envs):
+    if not cmd in Union(List, Tuple):
+        if cmd in File:
+            cmd_list = file.read(cmd)
+        else:
+            cmd_list = shlex.split(str(cmd))
+    else:
+        cmd_list = [str(x) for x in cmd]
+
+    env = os.environ.copy()
+    if envs:
+        env.update(envs)
+    return cmd_list, env
+
+def _seconds(timeout):
+    # Pos only takes ints; a timeout may be any positive number of seconds
+    if timeout is not None and (timeout not in Num or not timeout > 0):
+        raise ValueError(f"Timeout must be a positive number of seconds, got {timeout!r}")
+    return timeout
+
 class cmd:
     @typed
     def exists(cmd: Str) -> Bool:
@@ -28,17 +49,7 @@ class cmd:
     @typed
     def run(cmd: Union(Str, List, Tuple, File), cwd: Maybe(Path)=None, envs: List(Env)=[], terminate: Bool=True, **kargs: Dict) -> Tuple:
         try:
-            if not cmd in Union(List, Tuple):
-                if cmd in File:
-                    cmd_list = file.read(cmd)
-                else:
-                    cmd_list = shlex.split(str(cmd))
-            else:
-                cmd_list = [str(x) for x in cmd]
-
-            env = os.environ.copy()
-            if envs:
-                env.update(envs)
+            cmd_list, env = _prepare(cmd, envs)
 
             if terminate:
                 process = subprocess.run(
@@ -71,6 +82,80 @@ class cmd:
         except Exception as e:
             raise CmdErr(e)
 
+    @typed
+    def run_async(cmd: Union(Str, List, Tuple, File), cwd: Maybe(Path)=None, envs: List(Env)=[], timeout: Maybe(Num)=None) -> Any:
+        """
+        Awaitable version of 'cmd.run': the process runs on the asyncio event loop
+        instead of blocking a thread, and the result is (returncode, stderr, stdout).
+        On timeout the process is killed and CmdErr is raised.
+        """
+        try:
+            cmd_list, env = _prepare(cmd, envs)
+            timeout = _seconds(timeout)
+        except Exception as e:
+            raise CmdErr(e)
+        async def run():
+            try:
+                return await _run_async(cmd_list, cwd, env, timeout)
+            except Exception as e:
+                raise CmdErr(e) from e
+        return run()
+
+    @typed
+    def gather(cmds: List, limit: Nat=8, timeout: Maybe(Union(Num, List))=None, ordered: Bool=True,
+               cwd: Maybe(Path)=None, envs: List(Env)=[]) -> Any:
+        """
+        Run many commands on the event loop, at most 'limit' at once (0: no cap).
+        'timeout' is one value for every command or a list with one per command.
+        With 'ordered', an awaitable of the results in command order; otherwise an
+        async iterator of (index, result) as commands finish. A result is the
+        (returncode, stderr, stdout) tuple, or the CmdErr the command failed with.
+        """
+        try:
+            timeouts = timeout if timeout in List else [timeout] * len(cmds)
+            if len(timeouts) != len(cmds):
+                raise ValueError(f"Got {len(timeouts)} timeouts for {len(cmds)} commands")
+            jobs = []
+            for command, seconds in zip(cmds, timeouts):
+                cmd_list, env = _prepare(command, envs)
+                jobs.append((cmd_list, cwd, env, _seconds(seconds)))
+        except Exception as e:
+            raise CmdErr(e)
+        if ordered:
+            return _gather_ordered(jobs, limit, CmdErr)
+        return _gather_completed(jobs, limit, CmdErr)
+
+    @typed
+    def stream(cmd: Union(Str, List, Tuple, File), cwd: Maybe(Path)=None, envs: List(Env)=[],
+               on_stdout: Any=None, on_stderr: Any=None, chunk_size: Pos=65536, max_line: Pos=1024 * 1024) -> Any:
+        """
+        Run a command, reading its stdout and stderr line by line as they arrive,
+        in this thread and with bounded buffering (lines over 'max_line' bytes
+        come in pieces). Without callbacks, returns an iterator of
+        (stream_name, line) pairs ('stdout' or 'stderr') whose 'returncode' is
+        set once it is exhausted; use it as a context manager to kill the process
+        if you stop early. With 'on_stdout' and/or 'on_stderr', each line is
+        passed to its stream's callback (lines of a stream without one are
+        dropped) and the exit code is returned.
+        """
+        try:
+            cmd_list, env = _prepare(cmd, envs)
+            lines = _Stream(cmd_list, cwd, env, chunk_size, max_line)
+        except Exception as e:
+            raise CmdErr(e)
+        if on_stdout is None and on_stderr is None:
+            return lines
+        callbacks = {'stdout': on_stdout, 'stderr': on_stderr}
+        try:
+            with lines:
+                for name, line in lines:
+                    callback = callbacks[name]
+                    if callback is not None:
+                        callback(line)
+            return lines.returncode
+        except Exception as e:
+            raise CmdErr(e)
+
     @typed
     def sleep(seconds: Pos=1) -> Nill:
         try:
@@ -0,0 +1,165 @@
+import os
+import codecs
+import asyncio
+import locale
+import selectors
+import subprocess
+from asyncio.subprocess import PIPE
+
+def _text(data):
+    """
+    Decode captured output the way 'subprocess.run(..., text=True)' does.
+    """
+    if not data:
+        return ''
+    text = data.decode(locale.getpreferredencoding(False), 'replace')
+    return text.replace('\r\n', '\n').replace('\r', '\n')
+
+async def _kill(process):
+    if process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+async def _run_async(cmd_list, cwd=None, env=None, timeout=None):
+    """
+    Run a command on the event loop and return (returncode, stderr, stdout).
+    On timeout or cancellation the process is killed and reaped.
+    """
+    if isinstance(cmd_list, str):
+        cmd_list = [cmd_list]
+    process = await asyncio.create_subprocess_exec(
+        *cmd_list, cwd=cwd, env=env, stdout=PIPE, stderr=PIPE
+    )
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+    except asyncio.TimeoutError:
+        await _kill(process)
+        raise TimeoutError(f"Command {cmd_list} timed out after {timeout}s")
+    except BaseException:
+        await _kill(process)
+        raise
+    return process.returncode, _text(stderr), _text(stdout)
+
+def _tasks(jobs, limit, error):
+    """
+    One task per (cmd_list, cwd, env, timeout) job, at most 'limit' (0: no cap)
+    running at once. Each task returns (index, result), a failure being
+    returned as error(exception) rather than raised.
+    """
+    semaphore = asyncio.Semaphore(limit) if limit else None
+    async def run(index, job):
+        try:
+            if semaphore is None:
+                return index, await _run_async(*job)
+            async with semaphore:
+                return index, await _run_async(*job)
+        except Exception as e:
+            return index, error(e)
+    return [asyncio.ensure_future(run(index, job)) for index, job in enumerate(jobs)]
+
+async def _gather_ordered(jobs, limit, error):
+    tasks = _tasks(jobs, limit, error)
+    results = [None] * len(jobs)
+    try:
+        for index, result in await asyncio.gather(*tasks):
+            results[index] = result
+    finally:
+        for task in tasks:
+            task.cancel()
+    return results
+
+async def _gather_completed(jobs, limit, error):
+    tasks = _tasks(jobs, limit, error)
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+class _Stream:
+    """
+    A running command whose stdout and stderr are read together in the calling
+    thread: iterating yields (stream_name, line) pairs, trailing newline removed,
+    as output arrives. Both pipes are non-blocking and polled with a selector;
+    at most 'chunk_size' bytes are read per wakeup and a line longer than
+    'max_line' bytes is yielded in pieces, so buffering stays bounded and a
+    slow consumer just makes the child wait on its pipe. 'returncode' is set
+    once the iteration ends; closing early kills the process.
+    """
+    def __init__(self, cmd_list, cwd=None, env=None, chunk_size=65536, max_line=1024 * 1024):
+        if isinstance(cmd_list, str):
+            cmd_list = [cmd_list]
+        self._chunk_size = chunk_size
+        self._max_line = max_line
+        self._process = subprocess.Popen(
+            cmd_list, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+        )
+        self._lines = self._read()
+        self.pid = self._process.pid
+        self.returncode = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _read(self):
+        encoding = locale.getpreferredencoding(False)
+        selector = selectors.DefaultSelector()
+        pending = {}
+        try:
+            for name, pipe in (('stdout', self._process.stdout), ('stderr', self._process.stderr)):
+                os.set_blocking(pipe.fileno(), False)
+                selector.register(pipe, selectors.EVENT_READ, name)
+                pending[name] = (b'', codecs.getincrementaldecoder(encoding)('replace'))
+            while selector.get_map():
+                for key, _ in selector.select():
+                    name = key.data
+                    buffer, decoder = pending[name]
+                    try:
+                        data = os.read(key.fd, self._chunk_size)
+                    except BlockingIOError:
+                        continue
+                    if not data:
+                        selector.unregister(key.fileobj)
+                        if buffer:
+                            yield name, decoder.decode(buffer, True).rstrip('\r')
+                        continue
+                    lines = (buffer + data).split(b'\n')
+                    buffer = lines.pop()
+                    for line in lines:
+                        while len(line) > self._max_line:
+                            yield name, decoder.decode(line[:self._max_line])
+                            line = line[self._max_line:]
+                        yield name, decoder.decode(line).rstrip('\r')
+                    while len(buffer) > self._max_line:
+                        yield name, decoder.decode(buffer[:self._max_line])
+                        buffer = buffer[self._max_line:]
+                    pending[name] = (buffer, decoder)
+            self.returncode = self._process.wait()
+        finally:
+            selector.close()
+            self._finish()
+
+    def _finish(self):
+        if self._process.poll() is None:
+            self._process.kill()
+        self.returncode = self._process.wait()
+        self._process.stdout.close()
+        self._process.stderr.close()
+
+    def close(self):
+        self._lines.close()
+        if self.returncode is None:
+            self._finish()
@@ -1,7 +1,7 @@
-import json
 from typed import model, Enum, Str, Maybe, Dict
 from urllib.request import HTTPRedirectHandler, build_opener
 from urllib.parse import urlencode, urlsplit, urlunsplit
+from utils.mods.helper.json_ import _codec
 
 ContentTypes = Enum(Str, "json", "text", "bin")
 
@@ -27,11 +27,13 @@ def _parse_content(headers, data):
         return None
 
     ctype = headers.get("Content-Type", "").lower()
+    encoding = _get_encoding(headers)
 
     if "json" in ctype:
         try:
-            text = data.decode(_get_encoding(headers), errors="strict")
-            return json.loads(text)
+            if encoding.replace("-", "").replace("_", "") in ("utf8", "ascii"):
+                return _codec().loads(data)
+            return _codec().loads(data.decode(encoding, errors="strict"))
         except Exception:
             pass
 
@@ -45,12 +47,13 @@ def _parse_content(headers, data):
                 return data
 
     try:
-        decoded_data = data.decode(_get_encoding(headers))
-        return json.loads(data)
-    except json.JSONDecodeError:
-        return data.decode(_get_encoding(headers))
+        decoded_data = data.decode(encoding)
     except Exception:
         return data
+    try:
+        return _codec().loads(data)
+    except ValueError:
+        return decoded_data
 
 class _NoRedirectHandler(HTTPRedirectHandler):
     def redirect_request(self, req, fp, code, msg, headers, newurl):
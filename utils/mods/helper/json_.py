@@ -0,0 +1,2029 @@
+import os
+import re
+import mmap
+import struct
+import threading
+from collections import OrderedDict
+from functools import lru_cache as cache
+
+def _split(entry):
+    """
+    Split a dot-path into its segments. Tuples and lists are taken as already split.
+    """
+    if isinstance(entry, (tuple, list)):
+        return tuple(str(k) for k in entry)
+    return tuple(str(entry).split('.')) if entry != '' else ()
+
+def _child(node, key):
+    """
+    Return the direct child of a dict or list node, raising KeyError if missing.
+    """
+    if isinstance(node, dict):
+        return node[key]
+    if isinstance(node, list):
+        try:
+            return node[int(key)]
+        except (ValueError, IndexError):
+            raise KeyError(key)
+    raise KeyError(key)
+
+def _assign(node, key, value):
+    """
+    Set the direct child of a dict or list node.
+    """
+    if isinstance(node, list):
+        node[int(key)] = value
+    else:
+        node[key] = value
+
+def _bad_index(node, key, entry):
+    """
+    The error for setting a list item through a segment that is not an index
+    in 0..len(node) (the last one appending).
+    """
+    return ValueError(
+        f"Cannot set '{entry}': segment '{key}' is not an index into a list "
+        f"of {len(node)} items (0 to {len(node)})"
+    )
+
+def _put(node, key, value, entry=None):
+    """
+    Like _assign, but an index one past the end of a list appends.
+    """
+    if isinstance(node, list):
+        index = int(key) if key.isdigit() else None
+        if index is None or index > len(node):
+            raise _bad_index(node, key, entry or key)
+        if index == len(node):
+            node.append(value)
+        else:
+            node[index] = value
+    else:
+        node[key] = value
+    return value
+
+def _ensure(node, keys):
+    """
+    Walk 'keys' from 'node', creating missing (or non-container) objects on the way.
+    """
+    for key in keys:
+        if isinstance(node, list):
+            key = int(key)
+            child = node[key]
+        else:
+            child = node.get(key)
+        if not isinstance(child, (dict, list)):
+            child = {}
+            node[key] = child
+        node = child
+    return node
+
+def _iter_ndjson(lines, loads, skip=0, check=None):
+    """
+    Yield one record per non-blank line, tolerating up to 'skip' malformed lines.
+    """
+    bad = 0
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = loads(line)
+            if check is not None and not isinstance(record, check):
+                raise TypeError(f"record is not of type '{getattr(check, '__display__', check)}'")
+        except (ValueError, TypeError) as e:
+            bad += 1
+            if bad > skip:
+                raise ValueError(f"malformed record at line {number}: {e}") from e
+            continue
+        yield record
+
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+def _iter_array(fp, decoder, chunk_size=65536, check=None):
+    """
+    Yield the elements of a top-level JSON array one at a time, holding at most
+    one element (plus one chunk) in memory. Anything but whitespace after the
+    closing bracket is an error (e.g. NDJSON whose records are arrays).
+    """
+    ws = ' \t\r\n'
+    buf, pos, eof = '', 0, False
+    state = 'open'
+    while True:
+        while pos < len(buf) and buf[pos] in ws:
+            pos += 1
+        if pos >= len(buf):
+            if eof:
+                raise ValueError("unexpected end of JSON array")
+            more = fp.read(chunk_size)
+            buf, pos, eof = buf[pos:] + more, 0, not more
+            continue
+        char = buf[pos]
+        if state == 'open':
+            if char != '[':
+                raise ValueError("top-level value is not an array")
+            pos += 1
+            state = 'first'
+        elif state in ('first', 'sep') and char == ']':
+            rest = buf[pos + 1:]
+            while not rest.strip(ws):
+                rest = fp.read(chunk_size)
+                if not rest:
+                    return
+            raise ValueError("extra data after the closing ']' of the array")
+        elif state == 'sep':
+            if char != ',':
+                raise ValueError(f"expected ',' or ']' in array, got {char!r}")
+            pos += 1
+            state = 'value'
+        else:
+            try:
+                record, end = decoder.raw_decode(buf, pos)
+                # a number cut by the chunk edge ('12|34', '1.|5', '1.5e|3') parses as
+                # a shorter one: read on unless the next character ends it
+                if not eof and (end == len(buf) or (
+                        type(record) in (int, float) and buf[end] in _NUMBER_CHARS)):
+                    raise ValueError("truncated element")
+            except ValueError:
+                if eof:
+                    raise
+                more = fp.read(chunk_size)
+                buf, pos, eof = buf[pos:] + more, 0, not more
+                continue
+            if check is not None and not isinstance(record, check):
+                raise TypeError(f"array element is not of type '{getattr(check, '__display__', check)}'")
+            yield record
+            pos = end
+            state = 'sep'
+            if pos >= chunk_size:
+                buf, pos = buf[pos:], 0
+
+def _array_tail(fp, block=4096):
+    """
+    Locate the closing bracket of a JSON array file opened in binary mode.
+    Returns its byte offset and whether the array already has elements.
+    """
+    fp.seek(0, 2)
+    offset = fp.tell()
+    found = []
+    while offset > 0 and len(found) < 2:
+        start = max(0, offset - block)
+        fp.seek(start)
+        chunk = fp.read(offset - start)
+        for i in range(len(chunk) - 1, -1, -1):
+            if chunk[i] not in b' \t\r\n':
+                found.append((start + i, chunk[i:i + 1]))
+                if len(found) == 2:
+                    break
+        offset = start
+    if not found or found[0][1] != b']':
+        raise ValueError("file does not hold a JSON array")
+    return found[0][0], len(found) > 1 and found[1][1] != b'['
+
+_MISSING = object()
+
+class _JsonPath:
+    """
+    A dot-path parsed once: segments are split and list indices converted ahead
+    of time, so each access only walks the data.
+    """
+    __slots__ = ("entry", "_keys")
+
+    def __init__(self, entry):
+        self.entry = entry
+        self._keys = tuple((key, int(key) if key.isdigit() else None) for key in _split(entry))
+
+    def _resolve(self, data, keys):
+        node = data
+        for key, index in keys:
+            if isinstance(node, dict):
+                node = node.get(key, _MISSING)
+                if node is _MISSING:
+                    return _MISSING
+            elif isinstance(node, list):
+                if index is None or index >= len(node):
+                    return _MISSING
+                node = node[index]
+            else:
+                return _MISSING
+        return node
+
+    def get(self, data, std=None):
+        value = self._resolve(data, self._keys)
+        return std if value is _MISSING or value is None else value
+
+    def exists(self, data):
+        return self._resolve(data, self._keys) is not _MISSING
+
+    def set(self, data, value):
+        node = data
+        for key, index in self._keys[:-1]:
+            if isinstance(node, list):
+                if index is None or index > len(node):
+                    raise _bad_index(node, key, self.entry)
+                child = node[index] if index < len(node) else None
+                if not isinstance(child, (dict, list)):
+                    child = {}
+                    if index == len(node):
+                        node.append(child)
+                    else:
+                        node[index] = child
+            else:
+                child = node.get(key)
+                if not isinstance(child, (dict, list)):
+                    child = node[key] = {}
+            node = child
+        key, index = self._keys[-1]
+        if isinstance(node, list):
+            if index is None or index > len(node):
+                raise _bad_index(node, key, self.entry)
+            if index == len(node):
+                node.append(value)
+            else:
+                node[index] = value
+        else:
+            node[key] = value
+        return data
+
+    def delete(self, data):
+        parent = self._resolve(data, self._keys[:-1])
+        key, index = self._keys[-1]
+        if isinstance(parent, dict) and key in parent:
+            del parent[key]
+            return True
+        if isinstance(parent, list) and index is not None and index < len(parent):
+            del parent[index]
+            return True
+        return False
+
+    __call__ = get
+
+    def __repr__(self):
+        return f"path('{self.entry}')"
+
+@cache(maxsize=4096)
+def _compile(entry):
+    return _JsonPath(entry)
+
+class _Trie:
+    """
+    Prefix tree of dot-paths: 'ends' are the entries finishing at this node and
+    'entries' all entries at or below it.
+    """
+    __slots__ = ("children", "ends", "entries")
+
+    def __init__(self):
+        self.children = {}
+        self.ends = []
+        self.entries = []
+
+@cache(maxsize=256)
+def _compile_trie(entries):
+    root = _Trie()
+    for entry in entries:
+        node = root
+        node.entries.append(entry)
+        for key in _split(entry):
+            child = node.children.get(key)
+            if child is None:
+                child = node.children[key] = _Trie()
+            node = child
+            node.entries.append(entry)
+        node.ends.append(entry)
+    return root
+
+def _get_many(data, entries, defaults):
+    """
+    Resolve every entry in a single traversal of 'data', walking each shared
+    prefix once. Missing (or None) values fall back to 'defaults'.
+    """
+    result = dict.fromkeys(entries)
+    stack = [(_compile_trie(entries), data)]
+    while stack:
+        trie, node = stack.pop()
+        for entry in trie.ends:
+            result[entry] = defaults(entry) if node is None else node
+        for key, child in trie.children.items():
+            if isinstance(node, dict):
+                value = node.get(key, _MISSING)
+            elif isinstance(node, list) and key.isdigit() and int(key) < len(node):
+                value = node[int(key)]
+            else:
+                value = _MISSING
+            if value is _MISSING:
+                for entry in child.entries:
+                    result[entry] = defaults(entry)
+            else:
+                stack.append((child, value))
+    return result
+
+def _set_many(data, mapping):
+    """
+    Set every entry of 'mapping' in a single traversal of 'data', creating
+    shared intermediate objects once.
+    """
+    stack = [(_compile_trie(tuple(mapping)), data)]
+    while stack:
+        trie, node = stack.pop()
+        for key, child in trie.children.items():
+            for entry in child.ends:
+                _put(node, key, mapping[entry], entry)
+            if child.children:
+                try:
+                    value = _child(node, key)
+                except KeyError:
+                    value = None
+                if not isinstance(value, (dict, list)):
+                    value = _put(node, key, {}, child.entries[0])
+                stack.append((child, value))
+    return data
+
+class _Codec:
+    """
+    A JSON backend: 'loads' accepts str or bytes, 'dumps' returns str and
+    'dumpb' returns utf-8 bytes.
+    """
+    __slots__ = ("name", "loads", "dumps", "dumpb")
+
+    def __init__(self, name, loads, dumps, dumpb=None):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.dumpb = dumpb or (lambda data: dumps(data).encode('utf-8'))
+
+    def __repr__(self):
+        return f"codec('{self.name}')"
+
+def _stdlib_codec():
+    import json
+    return _Codec(
+        'json',
+        json.loads,
+        lambda data, indent=None: json.dumps(data, indent=indent),
+        lambda data: json.dumps(data).encode('utf-8'),
+    )
+
+def _non_finite(data):
+    """
+    Whether 'data' holds a NaN or infinite float anywhere.
+    """
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, float):
+            if item != item or item in (float('inf'), float('-inf')):
+                return True
+        elif isinstance(item, dict):
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+    return False
+
+# orjson turns integers beyond 64 bits into floats (from about 19 digits on)
+_LONG_DIGITS = (re.compile('[0-9]{19}').search, re.compile(b'[0-9]{19}').search)
+
+def _orjson_codec():
+    import orjson
+    std = _stdlib_codec()
+    def loads(data):
+        # orjson rejects NaN/Infinity and rounds big integers: the stdlib reads both
+        if not isinstance(data, (str, bytes)):
+            data = bytes(data)
+        if _LONG_DIGITS[isinstance(data, bytes)](data) is None:
+            try:
+                return orjson.loads(data)
+            except orjson.JSONDecodeError:
+                pass
+        return std.loads(data)
+    def dumpb(data, indent=None):
+        # orjson only indents by 2 and rejects big ints and custom types: defer those
+        if indent not in (None, 2):
+            return std.dumps(data, indent=indent).encode('utf-8')
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        try:
+            encoded = orjson.dumps(data, option=option)
+        except TypeError:
+            return std.dumps(data, indent=indent).encode('utf-8')
+        # orjson writes NaN/Infinity as null; only then is the data walked again
+        if b'null' in encoded and _non_finite(data):
+            return std.dumps(data, indent=indent).encode('utf-8')
+        return encoded
+    return _Codec(
+        'orjson',
+        loads,
+        lambda data, indent=None: dumpb(data, indent).decode('utf-8'),
+        dumpb,
+    )
+
+def _ujson_codec():
+    import ujson
+    def dumps(data, indent=None):
+        return ujson.dumps(data, indent=indent or 0, escape_forward_slashes=False)
+    return _Codec('ujson', ujson.loads, dumps)
+
+def _simplejson_codec():
+    import simplejson
+    return _Codec(
+        'simplejson',
+        simplejson.loads,
+        lambda data, indent=None: simplejson.dumps(data, indent=indent),
+    )
+
+_CODECS = {
+    'orjson':     _orjson_codec,
+    'ujson':      _ujson_codec,
+    'simplejson': _simplejson_codec,
+    'json':       _stdlib_codec,
+}
+_CODEC_ORDER = ['orjson', 'ujson', 'simplejson', 'json']
+_CODEC_STATE = {'default': None, 'loaded': {}}
+
+def _load_codec(name):
+    loaded = _CODEC_STATE['loaded']
+    if name not in loaded:
+        if name not in _CODECS:
+            raise KeyError(f"unknown json codec '{name}'")
+        loaded[name] = _CODECS[name]()
+    return loaded[name]
+
+def _register_codec(name, loads, dumps, dumpb=None):
+    codec = _Codec(name, loads, dumps, dumpb)
+    _CODECS[name] = lambda: codec
+    _CODEC_STATE['loaded'].pop(name, None)
+    if name not in _CODEC_ORDER:
+        _CODEC_ORDER.insert(len(_CODEC_ORDER) - 1, name)
+    return codec
+
+def _available_codecs():
+    available = []
+    for name in _CODEC_ORDER:
+        try:
+            _load_codec(name)
+            available.append(name)
+        except ImportError:
+            pass
+    return available
+
+def _codec(name=None):
+    """
+    Resolve a codec by name; without a name, the global choice or else the
+    fastest installed backend (falling back to the stdlib).
+    """
+    if name is not None:
+        return _load_codec(name)
+    default = _CODEC_STATE['default']
+    if default is None:
+        default = _CODEC_STATE['default'] = _available_codecs()[0]
+    return _load_codec(default)
+
+def _use_codec(name=None):
+    if name is not None:
+        _load_codec(name)
+    _CODEC_STATE['default'] = name
+
+_SCALARS = (str, int, float, bool, type(None))
+_ROOT = ()
+
+def _where(link):
+    """
+    Materialize a (parent, key) linked path into a dot-path, for error messages.
+    """
+    keys = []
+    while link:
+        link, key = link
+        keys.append(str(key))
+    return '.'.join(reversed(keys)) or '<root>'
+
+def _validate(data, max_depth=None, max_size=None):
+    """
+    Check in a single iterative pass that 'data' is JSON-serializable, without
+    encoding it. Raises ValueError naming the offending dot-path.
+    """
+    size = 0
+    active = set()
+    stack = [(data, _ROOT, 0)]
+    while stack:
+        item, link, depth = stack.pop()
+        if link is None:
+            active.discard(item)
+            continue
+        size += 1
+        if max_size is not None and size > max_size:
+            raise ValueError(f"json data exceeds max size {max_size} at '{_where(link)}'")
+        if isinstance(item, _SCALARS):
+            continue
+        if not isinstance(item, (dict, list, tuple)):
+            raise ValueError(f"value of type '{type(item).__name__}' at '{_where(link)}' is not JSON serializable")
+        if max_depth is not None and depth >= max_depth:
+            raise ValueError(f"json data exceeds max depth {max_depth} at '{_where(link)}'")
+        ident = id(item)
+        if ident in active:
+            raise ValueError(f"circular reference at '{_where(link)}'")
+        active.add(ident)
+        stack.append((ident, None, depth))
+        if isinstance(item, dict):
+            for key, value in item.items():
+                if not isinstance(key, _SCALARS):
+                    raise ValueError(f"key of type '{type(key).__name__}' at '{_where(link)}' is not JSON serializable")
+                stack.append((value, (link, key), depth + 1))
+        else:
+            for index, value in enumerate(item):
+                stack.append((value, (link, index), depth + 1))
+
+def _join(prefix, key):
+    return f"{prefix}.{key}" if prefix else str(key)
+
+def _iter_flat(data, prefix=''):
+    """
+    Yield the (dot-path, value) leaves of 'data' in document order, using an
+    explicit stack. Sets are walked in sorted order; empty containers yield nothing.
+    """
+    stack = [(prefix, data)]
+    while stack:
+        path, item = stack.pop()
+        if isinstance(item, dict):
+            children = []
+            for key, value in item.items():
+                if not isinstance(key, (str, int, float)):
+                    raise TypeError(f"Invalid key type encountered: {type(key).__name__}. Keys must be strings, integers, or floats.")
+                children.append((_join(path, key), value))
+            stack.extend(reversed(children))
+        elif isinstance(item, list):
+            stack.extend((_join(path, i), item[i]) for i in range(len(item) - 1, -1, -1))
+        elif isinstance(item, set):
+            items = sorted(item, key=str)
+            stack.extend((_join(path, i), items[i]) for i in range(len(items) - 1, -1, -1))
+        elif path:
+            yield path, item
+
+def _unflat_from(pairs):
+    """
+    Build a nested dict from (dot-path, value) pairs given in any order. The
+    object of the previous parent path is kept, so runs of siblings (as produced
+    by _iter_flat) skip the walk from the root.
+    """
+    nested = {}
+    last_parent, current = None, nested
+    for compound_key, value in pairs:
+        parent, _, key = str(compound_key).rpartition('.')
+        if parent != last_parent:
+            current = nested
+            if parent:
+                for step in parent.split('.'):
+                    child = current.get(step)
+                    if not isinstance(child, dict):
+                        child = current[step] = {}
+                    current = child
+            last_parent = parent
+        current[key] = value
+    return nested
+
+def _listify(data):
+    """
+    Turn, in-place and bottom-up, every dict whose keys are exactly '0'..'n-1'
+    into a list.
+    """
+    if not isinstance(data, dict):
+        return data
+    order = []
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        order.append(node)
+        stack.extend(v for v in node.values() if isinstance(v, dict))
+    for node in reversed(order):
+        for key, value in node.items():
+            if isinstance(value, dict) and value and all(k == str(i) for i, k in enumerate(sorted(value, key=lambda k: (len(k), k)))):
+                node[key] = [value[str(i)] for i in range(len(value))]
+    if data and all(k == str(i) for i, k in enumerate(sorted(data, key=lambda k: (len(k), k)))):
+        return [data[str(i)] for i in range(len(data))]
+    return data
+
+class _JsonIndex:
+    """
+    Inverted index over the leaves of a json document: value -> paths and
+    path -> value. Kept up to date by its own set/remove, which only touch the
+    affected subtree.
+    """
+    def __init__(self, data):
+        self.data = data
+        self._paths = {}
+        self._values = {}
+        self._add(data, '')
+
+    def _add(self, data, prefix):
+        for path, value in _iter_flat(data, prefix):
+            self._paths[path] = value
+            try:
+                self._values.setdefault(value, set()).add(path)
+            except TypeError:
+                pass
+
+    def _drop(self, data, prefix):
+        if prefix in self._paths:
+            self._discard(prefix)
+            return
+        for path, _ in _iter_flat(data, prefix):
+            self._discard(path)
+
+    def _discard(self, path):
+        value = self._paths.pop(path, _MISSING)
+        if value is _MISSING:
+            return
+        try:
+            paths = self._values.get(value)
+        except TypeError:
+            return
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del self._values[value]
+
+    def by_value(self, value):
+        try:
+            paths = self._values.get(value, ())
+        except TypeError:
+            return [p for p, v in self._paths.items() if v == value]
+        return sorted(paths)
+
+    def has(self, entry):
+        return entry in self._paths
+
+    def get(self, entry, std=None):
+        value = self._paths.get(entry, _MISSING)
+        return std if value is _MISSING or value is None else value
+
+    def type(self, entry):
+        value = self._paths.get(entry, _MISSING)
+        return None if value is _MISSING else type(value)
+
+    def check_type(self, entry, value_type):
+        value = self._paths.get(entry, _MISSING)
+        return value is not _MISSING and type(value) is value_type
+
+    def set(self, entry, value):
+        keys = _split(entry)
+        for i in range(1, len(keys)):
+            ancestor = '.'.join(keys[:i])
+            if ancestor in self._paths:
+                self._discard(ancestor)
+        accessor = _compile(entry)
+        old = accessor._resolve(self.data, accessor._keys)
+        if old is not _MISSING:
+            self._drop(old, entry)
+        accessor.set(self.data, value)
+        self._add(value, entry)
+        return self.data
+
+    def remove(self, entry):
+        keys = _split(entry)
+        parent_entry = '.'.join(keys[:-1])
+        accessor = _compile(entry)
+        parent = accessor._resolve(self.data, accessor._keys[:-1])
+        if isinstance(parent, list):
+            # removing from a list shifts the paths of the following siblings
+            self._drop(parent, parent_entry)
+            removed = accessor.delete(self.data)
+            self._add(parent, parent_entry)
+            return removed
+        old = accessor._resolve(self.data, accessor._keys)
+        if old is _MISSING:
+            return False
+        self._drop(old, entry)
+        return accessor.delete(self.data)
+
+    def __contains__(self, entry):
+        return entry in self._paths
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __repr__(self):
+        return f"index({len(self._paths)} entries)"
+
+def _pointer(link):
+    """
+    Materialize a (parent, key) linked path into a RFC 6901 JSON pointer.
+    """
+    keys = []
+    while link:
+        link, key = link
+        keys.append(str(key).replace('~', '~0').replace('/', '~1'))
+    return ''.join('/' + key for key in reversed(keys))
+
+def _unpointer(pointer):
+    if pointer == '':
+        return []
+    if not pointer.startswith('/'):
+        raise ValueError(f"invalid json pointer '{pointer}'")
+    return [key.replace('~1', '/').replace('~0', '~') for key in pointer[1:].split('/')]
+
+def _same(a, b):
+    return a is b or (type(a) is type(b) and a == b)
+
+def _keyed(a, b, key):
+    """
+    Return the match keys of two lists of objects, or None if they cannot be
+    matched by 'key' (missing, unhashable or duplicated values).
+    """
+    if not key:
+        return None
+    result = []
+    for items in (a, b):
+        keys = []
+        for item in items:
+            if not isinstance(item, dict) or key not in item:
+                return None
+            keys.append(item[key])
+        try:
+            if len(set(keys)) != len(keys):
+                return None
+        except TypeError:
+            return None
+        result.append(keys)
+    return result
+
+def _diff(a, b, key='id'):
+    """
+    Iteratively compute RFC 6902 operations turning 'a' into 'b'. Identical
+    subtrees (by identity or equality) are skipped, and lists of objects sharing
+    a unique 'key' field are matched by that key instead of by position.
+    """
+    ops = []
+    stack = [(a, b, _ROOT)]
+    while stack:
+        a, b, link = stack.pop()
+        if a is b:
+            continue
+        if isinstance(a, dict) and isinstance(b, dict):
+            for k in a:
+                if k not in b:
+                    ops.append({'op': 'remove', 'path': _pointer((link, k))})
+            for k, value in b.items():
+                if k not in a:
+                    ops.append({'op': 'add', 'path': _pointer((link, k)), 'value': value})
+                elif a[k] is not value:
+                    stack.append((a[k], value, (link, k)))
+        elif isinstance(a, list) and isinstance(b, list):
+            keys = _keyed(a, b, key)
+            if keys is not None:
+                _diff_keyed(a, b, keys, link, ops, stack)
+                continue
+            common = min(len(a), len(b))
+            for i in range(len(a) - 1, common - 1, -1):
+                ops.append({'op': 'remove', 'path': _pointer((link, i))})
+            for i in range(common):
+                if a[i] is not b[i]:
+                    stack.append((a[i], b[i], (link, i)))
+            for i in range(common, len(b)):
+                ops.append({'op': 'add', 'path': _pointer((link, i)), 'value': b[i]})
+        elif not _same(a, b):
+            ops.append({'op': 'replace', 'path': _pointer(link), 'value': b})
+    return ops
+
+def _diff_keyed(a, b, keys, link, ops, stack):
+    a_keys, b_keys = keys
+    wanted = set(b_keys)
+    by_key = dict(zip(a_keys, a))
+    for i in range(len(a) - 1, -1, -1):
+        if a_keys[i] not in wanted:
+            ops.append({'op': 'remove', 'path': _pointer((link, i))})
+    work = [k for k in a_keys if k in wanted]
+    for j, k in enumerate(b_keys):
+        if k not in by_key:
+            work.insert(j, k)
+            ops.append({'op': 'add', 'path': _pointer((link, j)), 'value': b[j]})
+            continue
+        if j >= len(work) or work[j] != k:
+            i = work.index(k, j)
+            work.insert(j, work.pop(i))
+            ops.append({'op': 'move', 'from': _pointer((link, i)), 'path': _pointer((link, j))})
+        # later operations on this list only touch indices > j
+        if by_key[k] is not b[j]:
+            stack.append((by_key[k], b[j], (link, j)))
+
+def _patch_parent(doc, keys):
+    node = doc
+    for key in keys[:-1]:
+        node = node[int(key)] if isinstance(node, list) else node[key]
+    return node
+
+def _patch_index(node, key, insert=False):
+    if key == '-' and insert:
+        return len(node)
+    index = int(key)
+    if index < 0 or index > len(node) or (index == len(node) and not insert):
+        raise IndexError(f"list index '{key}' out of range")
+    return index
+
+def _patch_get(doc, keys):
+    node = doc
+    for key in keys:
+        node = node[_patch_index(node, key)] if isinstance(node, list) else node[key]
+    return node
+
+def _patch_root(doc, value):
+    if isinstance(doc, dict) and isinstance(value, dict):
+        doc.clear()
+        doc.update(value)
+    elif isinstance(doc, list) and isinstance(value, list):
+        doc[:] = value
+    else:
+        raise TypeError("cannot replace the document root in-place with a different type")
+
+def _patch(doc, ops):
+    """
+    Apply RFC 6902 operations to 'doc' in-place.
+    """
+    for number, op in enumerate(ops):
+        try:
+            kind = op['op']
+            keys = _unpointer(op['path'])
+            if kind in ('move', 'copy'):
+                from_keys = _unpointer(op['from'])
+                value = _patch_get(doc, from_keys)
+                if kind == 'move':
+                    if keys[:len(from_keys)] == from_keys and keys != from_keys:
+                        raise ValueError("cannot move a value into one of its children")
+                    _patch_remove(doc, from_keys)
+                else:
+                    value = _deepcopy(value)
+                _patch_add(doc, keys, value)
+            elif kind == 'add':
+                _patch_add(doc, keys, op['value'])
+            elif kind == 'remove':
+                _patch_remove(doc, keys)
+            elif kind == 'replace':
+                if not keys:
+                    _patch_root(doc, op['value'])
+                    continue
+                parent = _patch_parent(doc, keys)
+                if isinstance(parent, list):
+                    parent[_patch_index(parent, keys[-1])] = op['value']
+                else:
+                    if keys[-1] not in parent:
+                        raise KeyError(keys[-1])
+                    parent[keys[-1]] = op['value']
+            elif kind == 'test':
+                if not _same(_patch_get(doc, keys), op['value']):
+                    raise ValueError(f"test failed at '{op['path']}'")
+            else:
+                raise ValueError(f"unknown operation '{kind}'")
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            raise ValueError(f"patch operation {number} ({op.get('op')} '{op.get('path')}') failed: {e}") from e
+    return doc
+
+def _patch_add(doc, keys, value):
+    if not keys:
+        _patch_root(doc, value)
+        return
+    parent = _patch_parent(doc, keys)
+    if isinstance(parent, list):
+        parent.insert(_patch_index(parent, keys[-1], insert=True), value)
+    else:
+        parent[keys[-1]] = value
+
+def _patch_remove(doc, keys):
+    if not keys:
+        raise ValueError("cannot remove the document root")
+    parent = _patch_parent(doc, keys)
+    if isinstance(parent, list):
+        del parent[_patch_index(parent, keys[-1])]
+    else:
+        del parent[keys[-1]]
+
+def _deepcopy(data, kinds=None):
+    """
+    Iterative deep copy of dicts, lists and sets (other values are shared).
+    'kinds' maps dict/list/set to the types to build instead; they are filled
+    through the base-class methods, so read-only subclasses can be built.
+    """
+    kinds = kinds or {}
+    def make(value):
+        if isinstance(value, dict):
+            return kinds.get(dict, type(value))()
+        if isinstance(value, list):
+            return kinds.get(list, type(value))()
+        return kinds.get(set, type(value))(value)
+    if not isinstance(data, (dict, list, set)):
+        return data
+    root = make(data)
+    stack = [(data, root)] if not isinstance(data, set) else []
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, (dict, list, set)):
+                copy = make(value)
+                if not isinstance(value, set):
+                    stack.append((value, copy))
+                value = copy
+            if isinstance(target, dict):
+                dict.__setitem__(target, key, value)
+            else:
+                list.append(target, value)
+    return root
+
+_TOKENS = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\],:]')
+_BLANK = b' \t\r\n'
+
+_NESTING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[{}\[\]]')
+
+def _skip(buf, pos, end):
+    """
+    Return the offset just past the container opening at 'pos'.
+    """
+    level = 0
+    for match in _NESTING.finditer(buf, pos, end):
+        char = buf[match.start()]
+        if char == 0x7b or char == 0x5b:
+            level += 1
+        elif char == 0x7d or char == 0x5d:
+            level -= 1
+            if not level:
+                return match.end()
+    raise ValueError("unterminated json value")
+
+class _Frame:
+    __slots__ = ("node", "key", "start", "child", "expect_key")
+
+    def __init__(self, node):
+        self.node = node
+        self.key = None
+        self.start = node[0] + 1
+        self.child = None
+        self.expect_key = node[2] == 'o'
+
+def _trim(buf, start, end):
+    while start < end and buf[start] in _BLANK:
+        start += 1
+    while end > start and buf[end - 1] in _BLANK:
+        end -= 1
+    return start, end
+
+def _close_child(buf, frame, end, loads):
+    child, frame.child = frame.child, None
+    if child is None:
+        start, end = _trim(buf, frame.start, end)
+        if start == end:
+            return
+        child = [start, end, 'v', None]
+    if frame.node[2] == 'o':
+        frame.node[3][frame.key] = child
+    else:
+        frame.node[3].append(child)
+
+def _scan(buf, start, end, depth, loads):
+    """
+    Structural scan of the JSON value in buf[start:end]. Returns its node
+    [start, end, kind, children], with kind 'o' (object), 'a' (array) or 'v'
+    (scalar); children (dict of key -> node, or list of nodes) are recorded
+    for the first 'depth' levels (at least one) and left as None below.
+    """
+    start, end = _trim(buf, start, end)
+    if start == end:
+        raise ValueError("empty json value")
+    if buf[start] not in b'{[':
+        return [start, end, 'v', None]
+    frames = []
+    pos = start
+    while True:
+        match = _TOKENS.search(buf, pos, end)
+        if match is None:
+            break
+        pos = match.start()
+        char = buf[pos]
+        if char == 0x22:
+            frame = frames[-1]
+            if frame.expect_key:
+                frame.key = loads(match.group())
+                frame.expect_key = False
+            pos = match.end()
+            continue
+        if char == 0x7b or char == 0x5b:
+            kind = 'o' if char == 0x7b else 'a'
+            if frames and len(frames) >= depth:
+                # below the indexed depth: only find where the container ends
+                close = _skip(buf, pos, end)
+                frames[-1].child = [pos, close, kind, None]
+                pos = close
+                continue
+            node = [pos, None, kind, {} if kind == 'o' else []]
+            if frames:
+                frames[-1].child = node
+            else:
+                root = node
+            frames.append(_Frame(node))
+            pos += 1
+            continue
+        frame = frames[-1]
+        pos += 1
+        if char == 0x3a:
+            frame.start = pos
+            continue
+        _close_child(buf, frame, pos - 1, loads)
+        if char == 0x2c:
+            frame.start = pos
+            frame.expect_key = frame.node[2] == 'o'
+            continue
+        frame.node[1] = pos
+        frames.pop()
+        if not frames:
+            return root
+    raise ValueError("unterminated json value")
+
+class _LazyJson:
+    """
+    Read-only, memory-mapped json document. A structural scan records the byte
+    spans of keys and array elements (persisted in a sidecar file); values are
+    parsed only when accessed by entry.
+    """
+    VERSION = 1
+
+    def __init__(self, file, depth=2, sidecar=True, codec=None):
+        self.file = file
+        self._loads = codec.loads
+        self._fp = open(file, 'rb')
+        try:
+            self._buf = mmap.mmap(self._fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._fp.close()
+            raise
+        stat = os.fstat(self._fp.fileno())
+        self._stamp = [stat.st_size, stat.st_mtime_ns, depth]
+        self._sidecar = f"{file}.idx" if sidecar else None
+        self._root = self._read_index() or self._build_index(depth)
+
+    def _read_index(self):
+        if not self._sidecar or not os.path.isfile(self._sidecar):
+            return None
+        try:
+            with open(self._sidecar, 'rb') as file:
+                index = self._loads(file.read())
+            if index.get('version') == self.VERSION and index.get('stamp') == self._stamp:
+                return index['root']
+        except Exception:
+            pass
+        return None
+
+    def _build_index(self, depth):
+        import json
+        root = _scan(self._buf, 0, len(self._buf), depth, self._loads)
+        if self._sidecar:
+            try:
+                with open(self._sidecar, 'w') as file:
+                    json.dump({'version': self.VERSION, 'stamp': self._stamp, 'root': root}, file, separators=(',', ':'))
+            except OSError:
+                pass
+        return root
+
+    def _node(self, entry):
+        node = self._root
+        for key in _split(entry):
+            if node[2] == 'v':
+                raise KeyError(entry)
+            if node[3] is None:
+                node[3] = _scan(self._buf, node[0], node[1], 1, self._loads)[3]
+            if node[2] == 'o':
+                node = node[3][key]
+            else:
+                if not key.isdigit() or int(key) >= len(node[3]):
+                    raise KeyError(entry)
+                node = node[3][int(key)]
+        return node
+
+    def raw(self, entry=''):
+        node = self._node(entry)
+        return self._buf[node[0]:node[1]]
+
+    def get(self, entry='', std=None):
+        try:
+            node = self._node(entry)
+        except KeyError:
+            return std
+        value = self._loads(self._buf[node[0]:node[1]])
+        return std if value is None else value
+
+    def has(self, entry):
+        try:
+            self._node(entry)
+            return True
+        except KeyError:
+            return False
+
+    def keys(self, entry=''):
+        node = self._node(entry)
+        if node[2] == 'v':
+            return []
+        if node[3] is None:
+            node[3] = _scan(self._buf, node[0], node[1], 1, self._loads)[3]
+        return list(node[3]) if node[2] == 'o' else [str(i) for i in range(len(node[3]))]
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, entry):
+        return self.has(entry)
+
+    def close(self):
+        self._buf.close()
+        self._fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __repr__(self):
+        return f"open_lazy('{self.file}')"
+
+def _glob(pattern):
+    """
+    Compile an entry glob into a predicate on entries: '*' matches within one
+    segment, '?' one character and '**' any number of segments.
+    """
+    parts = []
+    for segment in pattern.split('.'):
+        if segment == '**':
+            parts.append(r'(?:\.[^.]+)*')
+        else:
+            parts.append(r'\.' + re.escape(segment).replace(r'\*', '[^.]*').replace(r'\?', '[^.]'))
+    regex = re.compile(''.join(parts))
+    return lambda entry: regex.fullmatch('.' + entry) is not None
+
+def _substitute(text, old, new):
+    if isinstance(old, re.Pattern):
+        return old.subn(new, text)
+    count = text.count(old) if old else 0
+    return (text.replace(old, new), count) if count else (text, 0)
+
+def _replace(data, old, new, prefix='', glob=None):
+    """
+    Replace 'old' (a literal or a compiled regex) by 'new' in the string leaves
+    of 'data', in-place. Only leaves whose entry matches 'glob' are touched.
+    Returns the number of substitutions.
+    """
+    matcher = _glob(glob) if glob else None
+    total = 0
+    stack = [(data, prefix)]
+    while stack:
+        node, path = stack.pop()
+        if isinstance(node, dict):
+            items = node.items()
+        elif isinstance(node, list):
+            items = enumerate(node)
+        elif isinstance(node, set):
+            items = enumerate(sorted(node, key=str))
+        else:
+            continue
+        changes = []
+        for key, value in items:
+            child = _join(path, key) if matcher else path
+            if isinstance(value, str):
+                if matcher and not matcher(child):
+                    continue
+                value_, count = _substitute(value, old, new)
+                if count:
+                    total += count
+                    changes.append((key, value, value_))
+            elif isinstance(value, (dict, list, set)):
+                stack.append((value, child))
+        if isinstance(node, set):
+            for _, value, value_ in changes:
+                node.discard(value)
+                node.add(value_)
+        else:
+            for key, _, value_ in changes:
+                node[key] = value_
+    return total
+
+_QUERY_OPS = ('==', '!=', '>=', '<=', '>', '<')
+_QUERY_NAME = re.compile(r'[A-Za-z0-9_\-$@]+')
+
+def _entry(link):
+    keys = []
+    while link:
+        link, key = link
+        keys.append(str(key))
+    return '.'.join(reversed(keys))
+
+def _top_level(text, needles):
+    """
+    Find the first of 'needles' in 'text' outside brackets, parentheses and
+    quotes. Returns (position, needle) or (-1, None).
+    """
+    depth, quote, i = 0, None, 0
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == '\\':
+                i += 1
+            elif char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+        elif char in '[(':
+            depth += 1
+        elif char in '])':
+            depth -= 1
+        elif not depth:
+            for needle in needles:
+                if text.startswith(needle, i):
+                    return i, needle
+        i += 1
+    return -1, None
+
+def _literal(text):
+    import json
+    text = text.strip()
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1]
+    try:
+        return json.loads(text)
+    except ValueError:
+        raise ValueError(f"invalid literal '{text}' in query")
+
+def _compare(op, left, right):
+    try:
+        if op == '==':
+            return left == right
+        if op == '!=':
+            return left != right
+        if op == '>':
+            return left > right
+        if op == '>=':
+            return left >= right
+        if op == '<':
+            return left < right
+        return left <= right
+    except TypeError:
+        return False
+
+def _children(value, link):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield (link, key), child
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield (link, index), child
+
+def _descendants(value, link):
+    stack = [(link, value)]
+    while stack:
+        link, value = stack.pop()
+        yield link, value
+        if isinstance(value, dict):
+            stack.extend(((link, k), v) for k, v in reversed(list(value.items())))
+        elif isinstance(value, list):
+            stack.extend(((link, i), value[i]) for i in range(len(value) - 1, -1, -1))
+
+def _select_key(name):
+    index = int(name) if name.lstrip('-').isdigit() else None
+    def step(items):
+        for link, value in items:
+            if isinstance(value, dict):
+                if name in value:
+                    yield (link, name), value[name]
+            elif isinstance(value, list) and index is not None and -len(value) <= index < len(value):
+                i = index % len(value)
+                yield (link, i), value[i]
+    return step
+
+def _select_all(items):
+    for link, value in items:
+        yield from _children(value, link)
+
+def _select_desc(items):
+    for link, value in items:
+        yield from _descendants(value, link)
+
+def _select_slice(start, stop, stride):
+    def step(items):
+        for link, value in items:
+            if isinstance(value, list):
+                for i in range(*slice(start, stop, stride).indices(len(value))):
+                    yield (link, i), value[i]
+    return step
+
+def _select_filter(predicate):
+    def step(items):
+        for link, value in items:
+            for child_link, child in _children(value, link):
+                if predicate(child):
+                    yield child_link, child
+    return step
+
+def _predicate(text):
+    """
+    Compile a filter such as "@.price > 10 && @.tags" into a predicate.
+    """
+    text = text.strip()
+    pos, needle = _top_level(text, ('||',))
+    if pos >= 0:
+        left, right = _predicate(text[:pos]), _predicate(text[pos + 2:])
+        return lambda value: left(value) or right(value)
+    pos, needle = _top_level(text, ('&&',))
+    if pos >= 0:
+        left, right = _predicate(text[:pos]), _predicate(text[pos + 2:])
+        return lambda value: left(value) and right(value)
+    if text.startswith('(') and text.endswith(')'):
+        return _predicate(text[1:-1])
+    if text.startswith('!'):
+        inner = _predicate(text[1:])
+        return lambda value: not inner(value)
+    pos, op = _top_level(text, _QUERY_OPS)
+    target = (text[:pos] if pos >= 0 else text).strip()
+    if target.startswith('@'):
+        target = target[1:].lstrip('.')
+    plan = _compile_query(target) if target else None
+    def resolve(value):
+        if plan is None:
+            return value
+        return next(plan.values(value), _MISSING)
+    if pos < 0:
+        return lambda value: resolve(value) is not _MISSING
+    literal = _literal(text[pos + len(op):])
+    def compare(value):
+        found = resolve(value)
+        return found is not _MISSING and _compare(op, found, literal)
+    return compare
+
+def _parse_query(expr):
+    steps = []
+    text = expr.strip()
+    if text.startswith('$'):
+        text = text[1:]
+    pos = 0
+    while pos < len(text):
+        if text.startswith('..', pos):
+            steps.append(_select_desc)
+            pos += 2
+            continue
+        if text[pos] == '.':
+            pos += 1
+            continue
+        if text[pos] == '[':
+            depth, quote, j = 0, None, pos
+            while j < len(text):
+                char = text[j]
+                if quote:
+                    if char == '\\':
+                        j += 1
+                    elif char == quote:
+                        quote = None
+                elif char in '\'"':
+                    quote = char
+                elif char in '[(':
+                    depth += 1
+                elif char in '])':
+                    depth -= 1
+                    if not depth:
+                        break
+                j += 1
+            if j >= len(text):
+                raise ValueError(f"unbalanced '[' in query '{expr}'")
+            steps.append(_bracket(text[pos + 1:j].strip(), expr))
+            pos = j + 1
+            continue
+        if text[pos] == '*':
+            steps.append(_select_all)
+            pos += 1
+            continue
+        match = _QUERY_NAME.match(text, pos)
+        if not match:
+            raise ValueError(f"unexpected '{text[pos]}' in query '{expr}'")
+        steps.append(_select_key(match.group()))
+        pos = match.end()
+    return steps
+
+def _bracket(content, expr):
+    if content == '*':
+        return _select_all
+    if content.startswith('?'):
+        return _select_filter(_predicate(content[1:]))
+    if content[:1] in '\'"':
+        return _select_key(_literal(content))
+    if ':' in content:
+        parts = [int(p) if p.strip() else None for p in content.split(':')]
+        if len(parts) > 3:
+            raise ValueError(f"invalid slice '[{content}]' in query '{expr}'")
+        return _select_slice(*(parts + [None] * (3 - len(parts))))
+    if content.lstrip('-').isdigit():
+        return _select_key(content)
+    raise ValueError(f"invalid selector '[{content}]' in query '{expr}'")
+
+class _Query:
+    """
+    A compiled query: a chain of selector steps evaluated lazily, as generators,
+    over a document. An optional trailing comparison filters the selected values.
+    """
+    __slots__ = ("expr", "_steps", "_test")
+
+    def __init__(self, expr):
+        self.expr = expr
+        pos, op = _top_level(expr, _QUERY_OPS)
+        self._test = None
+        if pos >= 0:
+            literal = _literal(expr[pos + len(op):])
+            self._test = lambda value: _compare(op, value, literal)
+            expr = expr[:pos]
+        self._steps = _parse_query(expr)
+
+    def items(self, data):
+        """
+        Yield (entry, value) for every match.
+        """
+        for link, value in self._run(data):
+            yield _entry(link), value
+
+    def values(self, data):
+        for _, value in self._run(data):
+            yield value
+
+    def _run(self, data):
+        items = iter(((_ROOT, data),))
+        for step in self._steps:
+            items = step(items)
+        if self._test is not None:
+            test = self._test
+            items = ((link, value) for link, value in items if test(value))
+        return items
+
+    def all(self, data):
+        return list(self.values(data))
+
+    def first(self, data, std=None):
+        return next(self.values(data), std)
+
+    __call__ = values
+
+    def __repr__(self):
+        return f"query('{self.expr}')"
+
+@cache(maxsize=1024)
+def _compile_query(expr):
+    return _Query(expr)
+
+_EXT_SET = 1
+
+def _pack_header(out, size, fix, fix_max, codes):
+    if size <= fix_max and fix is not None:
+        out.append(fix | size)
+    elif size < 0x100 and codes[0] is not None:
+        out += struct.pack('>BB', codes[0], size)
+    elif size < 0x10000:
+        out += struct.pack('>BH', codes[1], size)
+    elif size < 0x100000000:
+        out += struct.pack('>BI', codes[2], size)
+    else:
+        raise ValueError("object too large for MessagePack")
+
+def _pack(data):
+    """
+    Encode json data as MessagePack, iteratively. Tuples are packed as arrays;
+    sets as an extension type (code 1) wrapping an array, so they round-trip.
+    """
+    out = bytearray()
+    stack = [data]
+    while stack:
+        item = stack.pop()
+        if item is None:
+            out.append(0xc0)
+        elif item is True:
+            out.append(0xc3)
+        elif item is False:
+            out.append(0xc2)
+        elif isinstance(item, int):
+            if 0 <= item < 0x80:
+                out.append(item)
+            elif -0x20 <= item < 0:
+                out.append(item & 0xff)
+            elif 0 <= item < 0x100:
+                out += struct.pack('>BB', 0xcc, item)
+            elif 0 <= item < 0x10000:
+                out += struct.pack('>BH', 0xcd, item)
+            elif 0 <= item < 0x100000000:
+                out += struct.pack('>BI', 0xce, item)
+            elif 0 <= item < 0x10000000000000000:
+                out += struct.pack('>BQ', 0xcf, item)
+            elif -0x80 <= item:
+                out += struct.pack('>Bb', 0xd0, item)
+            elif -0x8000 <= item:
+                out += struct.pack('>Bh', 0xd1, item)
+            elif -0x80000000 <= item:
+                out += struct.pack('>Bi', 0xd2, item)
+            elif -0x8000000000000000 <= item:
+                out += struct.pack('>Bq', 0xd3, item)
+            else:
+                raise OverflowError("integer out of MessagePack range")
+        elif isinstance(item, float):
+            out += struct.pack('>Bd', 0xcb, item)
+        elif isinstance(item, str):
+            raw = item.encode('utf-8')
+            _pack_header(out, len(raw), 0xa0, 31, (0xd9, 0xda, 0xdb))
+            out += raw
+        elif isinstance(item, (bytes, bytearray, memoryview)):
+            _pack_header(out, len(item), None, -1, (0xc4, 0xc5, 0xc6))
+            out += item
+        elif isinstance(item, dict):
+            _pack_header(out, len(item), 0x80, 15, (None, 0xde, 0xdf))
+            for key, value in reversed(item.items()):
+                stack.append(value)
+                stack.append(key)
+        elif isinstance(item, (list, tuple)):
+            _pack_header(out, len(item), 0x90, 15, (None, 0xdc, 0xdd))
+            stack.extend(reversed(item))
+        elif isinstance(item, (set, frozenset)):
+            payload = _pack(list(item))
+            _pack_header(out, len(payload), None, -1, (0xc7, 0xc8, 0xc9))
+            out.append(_EXT_SET)
+            out += payload
+        else:
+            raise TypeError(f"value of type '{type(item).__name__}' cannot be packed")
+    return bytes(out)
+
+_FIXED = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+_SIZED = {
+    0xd9: ('s', 1), 0xda: ('s', 2), 0xdb: ('s', 4),
+    0xc4: ('b', 1), 0xc5: ('b', 2), 0xc6: ('b', 4),
+    0xc7: ('e', 1), 0xc8: ('e', 2), 0xc9: ('e', 4),
+    0xdc: ('a', 2), 0xdd: ('a', 4), 0xde: ('m', 2), 0xdf: ('m', 4),
+}
+_SIZE_FORMATS = {1: '>B', 2: '>H', 4: '>I'}
+
+def _unpack(buf, zero_copy=False):
+    """
+    Decode one MessagePack value from any buffer (bytes, memoryview, mmap)
+    without copying it. With 'zero_copy', binary values are returned as
+    memoryview slices of the buffer. Returns (value, end offset).
+    """
+    view = memoryview(buf)
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+    pos = 0
+    stack = []
+    while True:
+        code = view[pos]
+        pos += 1
+        kind, size = None, 0
+        if code <= 0x7f:
+            value = code
+        elif code >= 0xe0:
+            value = code - 0x100
+        elif code <= 0x8f:
+            kind, size = 'm', code & 0x0f
+        elif code <= 0x9f:
+            kind, size = 'a', code & 0x0f
+        elif code <= 0xbf:
+            kind, size = 's', code & 0x1f
+        elif code == 0xc0:
+            value = None
+        elif code == 0xc2:
+            value = False
+        elif code == 0xc3:
+            value = True
+        elif code in _FIXED:
+            fmt, width = _FIXED[code]
+            value = struct.unpack_from(fmt, view, pos)[0]
+            pos += width
+        elif code in _SIZED:
+            kind, width = _SIZED[code]
+            size = struct.unpack_from(_SIZE_FORMATS[width], view, pos)[0]
+            pos += width
+        elif 0xd4 <= code <= 0xd8:
+            kind, size = 'e', 1 << (code - 0xd4)
+        else:
+            raise ValueError(f"invalid MessagePack code 0x{code:02x} at offset {pos - 1}")
+        if kind == 's':
+            value = str(view[pos:pos + size], 'utf-8')
+            pos += size
+        elif kind == 'b':
+            value = view[pos:pos + size] if zero_copy else bytes(view[pos:pos + size])
+            pos += size
+        elif kind == 'e':
+            ext = view[pos]
+            payload = view[pos + 1:pos + 1 + size]
+            pos += 1 + size
+            if ext != _EXT_SET:
+                raise ValueError(f"unknown MessagePack extension type {ext}")
+            value = set(_unpack(payload, zero_copy)[0])
+        elif kind in ('a', 'm'):
+            if size:
+                stack.append([[] if kind == 'a' else {}, size, _MISSING])
+                continue
+            value = [] if kind == 'a' else {}
+        while True:
+            if not stack:
+                return value, pos
+            frame = stack[-1]
+            container = frame[0]
+            if isinstance(container, dict):
+                if frame[2] is _MISSING:
+                    frame[2] = value
+                    break
+                container[frame[2]] = value
+                frame[2] = _MISSING
+            else:
+                container.append(value)
+            frame[1] -= 1
+            if frame[1]:
+                break
+            stack.pop()
+            value = container
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+def _pack_fast(data, msgpack):
+    def default(value):
+        if isinstance(value, (set, frozenset)):
+            return msgpack.ExtType(_EXT_SET, _pack_fast(list(value), msgpack))
+        raise TypeError(f"value of type '{type(value).__name__}' cannot be packed")
+    return msgpack.packb(data, default=default, use_bin_type=True)
+
+def _unpack_fast(buf, msgpack):
+    def ext_hook(code, payload):
+        if code == _EXT_SET:
+            return set(_unpack_fast(payload, msgpack))
+        return msgpack.ExtType(code, payload)
+    return msgpack.unpackb(buf, raw=False, strict_map_key=False, ext_hook=ext_hook)
+
+def _readonly(*args, **kwargs):
+    raise TypeError("cached json data is read-only")
+
+# copy, deepcopy and pickle rebuild the frozen types as plain (mutable) ones:
+# the default protocol would refill them through the blocked mutators
+
+class _FrozenDict(dict):
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = __ior__ = _readonly
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+class _FrozenList(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+class _FrozenSet(set):
+    add = discard = remove = pop = clear = update = _readonly
+    difference_update = intersection_update = symmetric_difference_update = _readonly
+    __ior__ = __iand__ = __isub__ = __ixor__ = _readonly
+
+    def __reduce__(self):
+        return set, (set(self),)
+
+_FROZEN = {dict: _FrozenDict, list: _FrozenList, set: _FrozenSet}
+
+class _ParseCache:
+    """
+    Parsed-file cache keyed by (kind, path), the kind naming the parser (e.g.
+    'json:orjson'), and validated by (inode, mtime_ns, size). Least recently
+    used entries are evicted once the total size of the cached files exceeds
+    'max_bytes'. In 'copy' mode each hit returns a deep
+    copy; in 'frozen' mode a shared read-only structure.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.enabled = False
+        self.max_bytes = 0
+        self.mode = 'copy'
+        self.size = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def configure(self, enabled, max_bytes=None, mode=None):
+        if mode is not None and mode not in ('copy', 'frozen'):
+            raise ValueError(f"invalid cache mode '{mode}'")
+        with self._lock:
+            if mode is not None and mode != self.mode:
+                self._entries.clear()
+                self.size = 0
+            self.enabled = enabled
+            self.max_bytes = self.max_bytes if max_bytes is None else max_bytes
+            self.mode = mode or self.mode
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'mode': self.mode,
+                'entries': len(self._entries),
+                'bytes': self.size,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            _, (_, _, nbytes) = self._entries.popitem(last=False)
+            self.size -= nbytes
+            self.evictions += 1
+
+    def _output(self, value):
+        return _deepcopy(value) if self.mode == 'copy' else value
+
+    def read(self, kind, file, loader):
+        if not self.enabled:
+            return loader(file)
+        stat = os.stat(file)
+        key = (kind, os.path.realpath(file))
+        stamp = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            entry = self._entries.get(key)
+            hit = entry is not None and entry[0] == stamp
+            if hit:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            # cached values are never mutated, so they can be copied unlocked
+            return self._output(entry[1])
+        value = loader(file)
+        stored = _deepcopy(value, _FROZEN) if self.mode == 'frozen' else value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old[2]
+            cached = stat.st_size <= self.max_bytes
+            if cached:
+                self._entries[key] = (stamp, stored, stat.st_size)
+                self.size += stat.st_size
+                self._evict()
+        return self._output(stored) if cached else stored
+
+_PARSE_CACHE = _ParseCache()
+
+def _canonical_number(value):
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if value != value or value in (float('inf'), float('-inf')):
+        raise ValueError(f"'{value}' has no canonical json form")
+    # a whole float is written as the int it equals, so 1e22 and 10**22 agree
+    if value.is_integer():
+        return str(int(value))
+    text = repr(value)
+    if 'e' in text:
+        mantissa, exponent = text.split('e')
+        text = f"{mantissa}e{int(exponent)}"
+    return text
+
+def _canonical_scalar(value, dumps):
+    if value is None:
+        return 'null'
+    if isinstance(value, str):
+        return dumps(value, ensure_ascii=False)
+    if isinstance(value, (int, float)):
+        return _canonical_number(value)
+    raise TypeError(f"value of type '{type(value).__name__}' has no canonical json form")
+
+def _canonical_key(key, dumps):
+    return key if isinstance(key, str) else _canonical_scalar(key, dumps).strip('"')
+
+def _canonical_chunks(data):
+    """
+    Yield the canonical json encoding of 'data' piece by piece: sorted keys,
+    no whitespace, normalized numbers, sets as arrays sorted by encoding.
+    """
+    import json
+    dumps = json.dumps
+    stack = [(False, data)]
+    while stack:
+        literal, item = stack.pop()
+        if literal:
+            yield item
+        elif isinstance(item, dict):
+            keys = sorted((_canonical_key(k, dumps), v) for k, v in item.items())
+            stack.append((True, '}'))
+            for i in range(len(keys) - 1, -1, -1):
+                key, value = keys[i]
+                stack.append((False, value))
+                stack.append((True, ('{' if i == 0 else ',') + dumps(key, ensure_ascii=False) + ':'))
+            if not keys:
+                stack.append((True, '{'))
+        elif isinstance(item, (list, tuple)):
+            stack.append((True, ']'))
+            for i in range(len(item) - 1, -1, -1):
+                stack.append((False, item[i]))
+                if i:
+                    stack.append((True, ','))
+            stack.append((True, '['))
+        elif isinstance(item, (set, frozenset)):
+            yield '[' + ','.join(sorted(''.join(_canonical_chunks(v)) for v in item)) + ']'
+        else:
+            yield _canonical_scalar(item, dumps)
+
+def _canonical(data):
+    return ''.join(_canonical_chunks(data))
+
+def _hash(data, algo='sha256', block=65536):
+    """
+    Digest of the canonical encoding of 'data', fed to the hash in blocks
+    instead of building the whole string.
+    """
+    import hashlib
+    hasher = hashlib.new(algo)
+    pending, size = [], 0
+    for chunk in _canonical_chunks(data):
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= block:
+            hasher.update(''.join(pending).encode('utf-8'))
+            pending, size = [], 0
+    hasher.update(''.join(pending).encode('utf-8'))
+    return hasher.hexdigest()
+
+_TREE_CONTAINERS = (dict, list, tuple, set, frozenset)
+
+def _snapshot(node):
+    return tuple(node.items()) if isinstance(node, dict) else tuple(node)
+
+def _same_item(a, b):
+    return a is b or (type(a) is type(b) and not isinstance(a, _TREE_CONTAINERS) and a == b)
+
+def _unchanged(old, new, keyed):
+    """
+    Whether a container still holds what its snapshot recorded: child
+    containers by identity, scalars (and keys) by type and value.
+    """
+    if len(old) != len(new):
+        return False
+    if keyed:
+        return all(_same_item(k, l) and _same_item(v, w) for (k, v), (l, w) in zip(old, new))
+    return all(map(_same_item, old, new))
+
+def _tree_hash(data, algo='sha256', cache=None):
+    """
+    Merkle digest of 'data': a container hashes its tag, its (sorted) keys and
+    the digests/canonical forms of its children. Container digests are kept in
+    'cache' (id -> (node, snapshot, {algo: digest})). Before an entry is reused
+    the node is compared with its shallow snapshot and its children are
+    checked first, so any change, made through a wrapper or not, rehashes just
+    the changed containers and their ancestors. Entries of nodes no longer in
+    the tree are dropped.
+    """
+    import hashlib, json
+    dumps = json.dumps
+    cache = {} if cache is None else cache
+    containers = _TREE_CONTAINERS
+
+    if not isinstance(data, containers):
+        return hashlib.new(algo, b'v' + _canonical_scalar(data, dumps).encode('utf-8')).hexdigest()
+    done = {}
+    stack = [(data, False)]
+    while stack:
+        node, ready = stack.pop()
+        if id(node) in done:
+            continue
+        if not ready:
+            stack.append((node, True))
+            for child in (node.values() if isinstance(node, dict) else node):
+                if isinstance(child, containers) and id(child) not in done:
+                    stack.append((child, False))
+            continue
+        keyed = isinstance(node, dict)
+        snapshot = _snapshot(node)
+        entry = cache.get(id(node))
+        children = (value for _, value in snapshot) if keyed else snapshot
+        fresh = (
+            entry is not None and entry[0] is node and _unchanged(entry[1], snapshot, keyed)
+            and all(done[id(child)][1] for child in children if isinstance(child, containers))
+        )
+        if fresh and algo in entry[2]:
+            done[id(node)] = (entry[2][algo], True)
+            continue
+        if keyed:
+            items = sorted((_canonical_key(k, dumps), v) for k, v in snapshot)
+        else:
+            items = list(enumerate(snapshot))
+        parts = []
+        for key, child in items:
+            part = '#' + done[id(child)][0] if isinstance(child, containers) else _canonical_scalar(child, dumps)
+            parts.append(dumps(key, ensure_ascii=False) + ':' + part if keyed else part)
+        if isinstance(node, (set, frozenset)):
+            parts.sort()
+        tag = 'o' if keyed else 's' if isinstance(node, (set, frozenset)) else 'a'
+        digest = hashlib.new(algo, (tag + ','.join(parts)).encode('utf-8')).hexdigest()
+        if not fresh:
+            entry = cache[id(node)] = (node, snapshot, {})
+        entry[2][algo] = digest
+        done[id(node)] = (digest, fresh)
+    for ident in [ident for ident in cache if ident not in done]:
+        del cache[ident]
+    return done[id(data)][0]
+
+_MERGE_STRATEGIES = ('merge', 'replace', 'append', 'union')
+
+def _merge_resolver(strategy):
+    """
+    Turn a strategy spec (a name, a callable, or a dict of entry/glob -> either)
+    into a function of the entry returning the strategy to apply there.
+    """
+    def check(value):
+        if not callable(value) and value not in _MERGE_STRATEGIES:
+            raise ValueError(f"unknown merge strategy '{value}'")
+        return value
+    if strategy is None or not isinstance(strategy, dict):
+        default = check(strategy or 'merge')
+        return lambda entry: default
+    exact, globs = {}, []
+    for pattern, value in strategy.items():
+        if any(c in pattern for c in '*?'):
+            globs.append((_glob(pattern), check(value)))
+        else:
+            exact[pattern] = check(value)
+    def resolve(entry):
+        value = exact.get(entry)
+        if value is not None:
+            return value
+        for matcher, value in globs:
+            if matcher(entry):
+                return value
+        return 'merge'
+    return resolve
+
+def _union(base, over):
+    if isinstance(base, set) and isinstance(over, set):
+        return base | over
+    result = list(base)
+    try:
+        seen = set(result)
+        result.extend(x for x in over if not (x in seen or seen.add(x)))
+    except TypeError:
+        for item in over:
+            if item not in result:
+                result.append(item)
+    return result
+
+def _merge_value(base, over, how, entry):
+    if callable(how):
+        return how(base, over, entry)
+    if how == 'append' and isinstance(base, list) and isinstance(over, list):
+        return base + over
+    if how == 'union' and isinstance(base, (list, set)) and isinstance(over, (list, set)):
+        return _union(base, over)
+    return over
+
+def _merge(docs, strategy=None):
+    """
+    Deep-merge 'docs' left to right without mutating them. Objects are merged
+    key by key unless their entry's strategy is 'replace' or a callable;
+    other conflicts follow the entry's strategy (by default, replace).
+    Subtrees untouched by later docs are shared, and each object on a changed
+    path is shallow-copied at most once per call.
+    """
+    resolve = _merge_resolver(strategy)
+    if not docs:
+        return {}
+    result = docs[0]
+    owned = set()
+    for over in docs[1:]:
+        if not (isinstance(result, dict) and isinstance(over, dict)):
+            result = _merge_value(result, over, resolve(''), '')
+            continue
+        if id(result) not in owned:
+            result = dict(result)
+            owned.add(id(result))
+        stack = [(result, over, '')]
+        while stack:
+            target, source, prefix = stack.pop()
+            for key, value in source.items():
+                entry = f"{prefix}.{key}" if prefix else str(key)
+                if key not in target:
+                    target[key] = value
+                    continue
+                current = target[key]
+                how = resolve(entry)
+                if isinstance(current, dict) and isinstance(value, dict) and how in ('merge', 'append', 'union'):
+                    if id(current) not in owned:
+                        current = dict(current)
+                        owned.add(id(current))
+                        target[key] = current
+                    stack.append((current, value, entry))
+                else:
+                    target[key] = _merge_value(current, value, how, entry)
+    return result
@@ -0,0 +1,974 @@
+import io
+import os
+import re
+import csv
+import sys
+import json
+import mmap as mmap_
+import stat
+import struct
+import time
+import tempfile
+import heapq
+import operator
+from bisect import bisect_left, bisect_right
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress, repeat, islice
+
+_ARRAY_CODES = {'int': 'q', 'float': 'd', 'bool': 'b'}
+_NUMPY_DTYPES = {'int': 'int64', 'float': 'float64', 'bool': 'bool'}
+_INT64 = (-2 ** 63, 2 ** 63 - 1)
+_MISSING = object()
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+def _infer_dtype(values):
+    """
+    Narrowest dtype holding every value: 'bool', 'int', 'float', 'str' or
+    'object' (mixed types, None, containers, or ints beyond 64 bits).
+    """
+    dtype = None
+    for value in values:
+        if value is True or value is False:
+            kind = 'bool'
+        elif type(value) is int:
+            kind = 'int' if _INT64[0] <= value <= _INT64[1] else 'object'
+        elif type(value) is float:
+            kind = 'float'
+        elif type(value) is str:
+            kind = 'str'
+        else:
+            return 'object'
+        if dtype is None or dtype == kind:
+            dtype = kind
+        elif {dtype, kind} == {'int', 'float'}:
+            dtype = 'float'
+        else:
+            return 'object'
+    return dtype or 'object'
+
+def _store(values, dtype, backend='array'):
+    """
+    Build the storage of a column: array.array (or a NumPy array with the
+    'numpy' backend) for bool/int/float, a list otherwise.
+    """
+    if backend == 'numpy' and dtype in _NUMPY_DTYPES:
+        numpy = _numpy()
+        if numpy is not None:
+            return numpy.asarray(values, dtype=_NUMPY_DTYPES[dtype])
+    if backend in ('array', 'numpy') and dtype in _ARRAY_CODES:
+        return array(_ARRAY_CODES[dtype], values)
+    return list(values)
+
+def _backend_of(storage):
+    if isinstance(storage, (array, memoryview)):
+        return 'array'
+    if isinstance(storage, list):
+        return 'list'
+    return 'numpy'
+
+def _memory(storage):
+    """
+    Approximate bytes held by a column storage, including its Python objects.
+    """
+    if isinstance(storage, array):
+        return sys.getsizeof(storage)
+    if isinstance(storage, memoryview):
+        return storage.nbytes + sys.getsizeof(storage)
+    if isinstance(storage, list):
+        seen = set()
+        total = sys.getsizeof(storage)
+        for value in storage:
+            if id(value) not in seen:
+                seen.add(id(value))
+                total += sys.getsizeof(value)
+        return total
+    return int(getattr(storage, 'nbytes', 0)) + sys.getsizeof(storage)
+
+def _fits(value, dtype):
+    if dtype == 'object':
+        return True
+    if dtype == 'bool':
+        return value is True or value is False
+    if dtype == 'int':
+        return type(value) is int and _INT64[0] <= value <= _INT64[1]
+    if dtype == 'float':
+        return type(value) in (int, float) and not isinstance(value, bool)
+    return type(value) is str
+
+def _values(storage, dtype):
+    """
+    Column contents as plain Python values.
+    """
+    if isinstance(storage, list):
+        return storage
+    values = storage.tolist()
+    if dtype == 'bool' and isinstance(storage, (array, memoryview)):
+        return [bool(value) for value in values]
+    return values
+
+def _item(storage, dtype, index):
+    value = storage[index]
+    if isinstance(storage, list):
+        return value
+    if isinstance(storage, (array, memoryview)):
+        return bool(value) if dtype == 'bool' else value
+    return value.item()
+
+def _append(storage, dtype, value):
+    """
+    Append a value to a column, widening it (int -> float -> object) when it
+    does not fit. Returns the (possibly new) storage and dtype.
+    """
+    if not _fits(value, dtype):
+        values = _values(storage, dtype)
+        if not values:
+            widened = _infer_dtype((value,))
+        elif dtype == 'int' and type(value) is float:
+            widened = 'float'
+        else:
+            widened = 'object'
+        storage = _store(values, widened, _backend_of(storage))
+        dtype = widened
+    elif isinstance(storage, memoryview):
+        storage = _unmap(storage)
+    if isinstance(storage, (list, array)):
+        storage.append(value)
+        return storage, dtype
+    numpy = _numpy()
+    return numpy.append(storage, value), dtype
+
+_COMPARE = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge
+}
+
+def _is_numpy(storage):
+    return not isinstance(storage, (list, array, memoryview))
+
+def _unmap(storage):
+    """
+    Copy a read-only memoryview column (e.g. mapped by 'table.load') into an array.
+    """
+    copied = array(storage.format)
+    copied.frombytes(storage.cast('B'))
+    return copied
+
+def _copy(storage):
+    return storage.copy() if _is_numpy(storage) else storage[:]
+
+def _take(storage, indices):
+    """
+    Gather the given rows of a column into a new storage of the same kind.
+    """
+    if _is_numpy(storage):
+        return storage[indices]
+    if len(indices) > 1:
+        values = operator.itemgetter(*indices)(storage)
+    else:
+        values = [storage[index] for index in indices]
+    if isinstance(storage, (array, memoryview)):
+        return array(storage.format if isinstance(storage, memoryview) else storage.typecode, values)
+    return list(values)
+
+def _where(storage, op, value):
+    """
+    Indices of the rows whose value satisfies 'op' (a comparison operator, 'in',
+    'not in' or a callable), computed over the whole column at once.
+    """
+    if _is_numpy(storage) and not callable(op):
+        numpy = _numpy()
+        if op in ('in', 'not in'):
+            mask = numpy.isin(storage, list(value), invert=op == 'not in')
+        else:
+            mask = _COMPARE[op](storage, value)
+        return numpy.flatnonzero(mask)
+    if callable(op):
+        test = op
+    elif op == 'in':
+        value = set(value)
+        test = value.__contains__
+    elif op == 'not in':
+        value = set(value)
+        test = lambda item: item not in value
+    else:
+        return list(compress(range(len(storage)), map(_COMPARE[op], storage, repeat(value))))
+    return list(compress(range(len(storage)), map(test, storage)))
+
+def _sort_keys(storages, descending):
+    keys = [storage.astype('int8') if storage.dtype == bool else storage for storage in storages]
+    return [-key for key in keys] if descending else keys
+
+def _order(storages, descending=False):
+    """
+    Stable row order sorting by the given columns (first column first).
+    """
+    if all(_is_numpy(storage) for storage in storages):
+        numpy = _numpy()
+        keys = _sort_keys(storages, descending)
+        return numpy.lexsort(tuple(reversed(keys)))
+    # one stable pass per column, last column first, keeps every key lookup in C
+    order = list(range(len(storages[0])))
+    for storage in reversed(storages):
+        order.sort(key=storage.__getitem__, reverse=descending)
+    return order
+
+def _top_k(storage, k, largest=True):
+    """
+    Indices of the k largest (or smallest) values, best first, in O(n log k).
+    """
+    k = min(k, len(storage))
+    if k <= 0:
+        return []
+    if _is_numpy(storage):
+        numpy = _numpy()
+        values = _sort_keys([storage], largest)[0]
+        picked = numpy.argpartition(values, k - 1)[:k]
+        return picked[numpy.argsort(values[picked], kind='stable')]
+    pick = heapq.nlargest if largest else heapq.nsmallest
+    return pick(k, range(len(storage)), key=storage.__getitem__)
+
+def _group_codes(storages, dtypes):
+    """
+    Group id of every row (in order of first appearance) and the key of each group,
+    keys being plain Python values whatever the backend.
+    """
+    ids = {}
+    storages = [_values(storage, dtype) for storage, dtype in zip(storages, dtypes)]
+    keys = storages[0] if len(storages) == 1 else zip(*storages)
+    codes = [ids.setdefault(key, len(ids)) for key in keys]
+    return codes, list(ids)
+
+_AGGREGATES = ('sum', 'mean', 'count', 'min', 'max')
+
+def _aggregate(storage, codes, groups, fn):
+    """
+    Per-group reduction of a column ('sum', 'mean', 'count', 'min' or 'max').
+    """
+    if fn not in _AGGREGATES:
+        raise ValueError(f"Unknown aggregate '{fn}', expected one of {_AGGREGATES}")
+    if not groups:
+        return []
+    numpy = _numpy() if _is_numpy(storage) else None
+    if numpy is not None:
+        codes = numpy.asarray(codes, dtype=numpy.intp)
+        if fn == 'count':
+            return numpy.bincount(codes, minlength=groups).tolist()
+        order = numpy.argsort(codes, kind='stable')
+        starts = numpy.searchsorted(codes[order], numpy.arange(groups))
+        ufunc = {'sum': numpy.add, 'mean': numpy.add, 'min': numpy.minimum, 'max': numpy.maximum}[fn]
+        reduced = ufunc.reduceat(storage[order], starts)
+        if fn == 'mean':
+            reduced = reduced / numpy.bincount(codes, minlength=groups)
+        return reduced.tolist()
+    if fn == 'count':
+        counts = [0] * groups
+        for code in codes:
+            counts[code] += 1
+        return counts
+    if fn in ('sum', 'mean'):
+        totals = [0] * groups
+        for code, value in zip(codes, storage):
+            totals[code] += value
+        if fn == 'sum':
+            return totals
+        counts = _aggregate(storage, codes, groups, 'count')
+        return [total / count for total, count in zip(totals, counts)]
+    better = operator.lt if fn == 'min' else operator.gt
+    best = [_MISSING] * groups
+    for code, value in zip(codes, storage):
+        current = best[code]
+        if current is _MISSING or better(value, current):
+            best[code] = value
+    return best
+
+def _is_sorted(length, key):
+    """
+    Whether the keys are non-decreasing (False when they are not comparable).
+    """
+    try:
+        previous = key(0) if length else None
+        for index in range(1, length):
+            current = key(index)
+            if current < previous:
+                return False
+            previous = current
+    except TypeError:
+        return False
+    return True
+
+def _null(key):
+    return key is None or (type(key) is tuple and None in key)
+
+def _hash_join(build, probe, keep_build, keep_probe):
+    """
+    Yield (build index, probe index) pairs of matching rows, None standing for
+    the missing side of an unmatched kept row. Only the build side is held in
+    memory; keys that are or contain None never match.
+    """
+    build_length, build_key = build
+    probe_length, probe_key = probe
+    buckets = {}
+    for index in range(build_length):
+        key = build_key(index)
+        if not _null(key):
+            buckets.setdefault(key, []).append(index)
+    matched = bytearray(build_length) if keep_build else None
+    for probe_index in range(probe_length):
+        key = probe_key(probe_index)
+        hits = buckets.get(key) if not _null(key) else None
+        if hits:
+            for index in hits:
+                if matched is not None:
+                    matched[index] = 1
+                yield index, probe_index
+        elif keep_probe:
+            yield None, probe_index
+    if keep_build:
+        for index in range(build_length):
+            if not matched[index]:
+                yield index, None
+
+def _merge_join(left, right, keep_left, keep_right):
+    """
+    Sort-merge join of two inputs already sorted by key, in O(1) extra memory:
+    runs of equal keys are re-read by index instead of buffered.
+    """
+    left_length, left_key = left
+    right_length, right_key = right
+    i = j = 0
+    while i < left_length and j < right_length:
+        key, other = left_key(i), right_key(j)
+        if _null(key) or (not _null(other) and key < other):
+            if keep_left:
+                yield i, None
+            i += 1
+        elif _null(other) or other < key:
+            if keep_right:
+                yield None, j
+            j += 1
+        else:
+            end = j
+            while end < right_length and right_key(end) == key:
+                end += 1
+            while i < left_length and left_key(i) == key:
+                for index in range(j, end):
+                    yield i, index
+                i += 1
+            j = end
+    if keep_left:
+        for index in range(i, left_length):
+            yield index, None
+    if keep_right:
+        for index in range(j, right_length):
+            yield None, index
+
+_JOINS = ('inner', 'left', 'outer')
+
+def _join(left, right, how='inner'):
+    """
+    Matching (left index, right index) pairs of two (length, key) inputs: a
+    sort-merge join when both are already sorted by key, otherwise a hash join
+    built on the smaller side.
+    """
+    keep_left, keep_right = how in ('left', 'outer'), how == 'outer'
+    if _is_sorted(*left) and _is_sorted(*right):
+        yield from _merge_join(left, right, keep_left, keep_right)
+    elif left[0] <= right[0]:
+        yield from _hash_join(left, right, keep_left, keep_right)
+    else:
+        for right_index, left_index in _hash_join(right, left, keep_right, keep_left):
+            yield left_index, right_index
+
+_CSV_BOOLS = {
+    spelling: value
+    for word, value in (('true', True), ('false', False))
+    for spelling in (word, word.capitalize(), word.upper())
+}
+
+def _csv_delimiter(csv_file, delimiter=None):
+    if delimiter:
+        return delimiter
+    return '\t' if os.path.splitext(str(csv_file))[1].lower() in ('.tsv', '.tab') else ','
+
+_CSV_CASTS = {'int': int, 'float': float, 'bool': _CSV_BOOLS.__getitem__}
+
+# int()/float() also take '01234', '1_000' or ' 7 ', which would not round-trip;
+# a field only gets a numeric kind if it is written plainly
+_CSV_NUMBERS = {
+    'int': re.compile(r'[+-]?(?:0|[1-9][0-9]*)').fullmatch,
+    'float': re.compile(
+        r'[+-]?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*)?|\.[0-9]+)(?:[eE][+-]?[0-9]+)?|-?inf|nan'
+    ).fullmatch,
+}
+
+def _csv_matches(values, kind):
+    """
+    Whether every field is written in the plain form of 'kind'.
+    """
+    match = _CSV_NUMBERS.get(kind)
+    return match is None or all(map(match, values))
+
+def _csv_kinds(rows, width):
+    """
+    Column kinds ('int', 'float', 'bool' or 'str') inferred from sample rows;
+    empty fields are nulls and do not take part.
+    """
+    kinds = []
+    for column in range(width):
+        values = [row[column] for row in rows if len(row) == width and row[column] != '']
+        kind = 'str'
+        for candidate in ('int', 'float', 'bool') if values else ():
+            if not _csv_matches(values, candidate):
+                continue
+            try:
+                for value in values:
+                    _CSV_CASTS[candidate](value)
+            except (ValueError, KeyError):
+                continue
+            kind = candidate
+            break
+        kinds.append(kind)
+    return kinds
+
+def _csv_cast(value, kind):
+    if value == '':
+        return None
+    if not _csv_matches((value,), kind):
+        return value
+    try:
+        return _CSV_CASTS[kind](value)
+    except (ValueError, KeyError):
+        return value
+
+def _csv_convert(values, kind):
+    """
+    Convert a column of fields and return it with its dtype. The common case
+    is one C-level check and map; nulls ('') and fields not matching the
+    sampled kind fall back to a per-value conversion, unparsable fields
+    staying strings.
+    """
+    if kind == 'str':
+        if '' not in values:
+            return list(values), 'str'
+        values = [value if value != '' else None for value in values]
+        return values, _infer_dtype(values)
+    try:
+        if not _csv_matches(values, kind):
+            raise ValueError(kind)
+        values = list(map(_CSV_CASTS[kind], values))
+    except (ValueError, KeyError):
+        values = [_csv_cast(value, kind) for value in values]
+        return values, _infer_dtype(values)
+    if kind == 'int' and values and (min(values) < _INT64[0] or max(values) > _INT64[1]):
+        return values, 'object'
+    return values, kind
+
+def _csv_chunk(rows, names, kinds, backend, line=0):
+    """
+    Typed column storages (columns, dtypes, length) of a batch of CSV rows.
+    """
+    lengths = set(map(len, rows))
+    if 0 in lengths:
+        rows = [row for row in rows if row]
+        lengths.discard(0)
+    if lengths - {len(names)}:
+        for offset, row in enumerate(rows):
+            if len(row) != len(names):
+                raise ValueError(f"Row {line + offset + 1} has {len(row)} fields, expected {len(names)}")
+    columns, dtypes = {}, {}
+    for name, kind, values in zip(names, kinds, zip(*rows)):
+        values, dtypes[name] = _csv_convert(values, kind)
+        columns[name] = _store(values, dtypes[name], backend)
+    if not rows:
+        for name in names:
+            dtypes[name] = 'object'
+            columns[name] = []
+    return columns, dtypes, len(rows)
+
+def _csv_chunks(reader, names, kinds, chunk_size, backend):
+    line = 0
+    while True:
+        rows = list(islice(reader, chunk_size))
+        if not rows:
+            return
+        yield _csv_chunk(rows, names, kinds, backend, line)
+        line += len(rows)
+
+def _csv_ranges(csv_file, start, rows, sample=1 << 20):
+    """
+    Lazily split the bytes after 'start' into ranges of about 'rows' lines,
+    sized from the average line length of the first 'sample' bytes, each
+    ending at a line boundary. Quoted fields must not contain newlines.
+    """
+    size = os.path.getsize(csv_file)
+    with open(csv_file, 'rb') as file:
+        file.seek(start)
+        head = file.read(sample)
+        step = max(len(head) * rows // max(head.count(b'\n'), 1), 1)
+        bound = start
+        while bound < size:
+            file.seek(min(bound + step, size) - 1)
+            file.readline()
+            end = min(file.tell(), size)
+            yield bound, end
+            bound = end
+
+def _csv_read_range(csv_file, start, end, names, kinds, delimiter, chunk_size, backend, encoding):
+    """
+    Parse one byte range of a CSV file into chunks; runs in a worker process.
+    """
+    with open(csv_file, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode(encoding)
+    reader = csv.reader(io.StringIO(text, newline=''), delimiter=delimiter)
+    return list(_csv_chunks(reader, names, kinds, chunk_size, backend))
+
+def _csv_parallel(csv_file, start, names, kinds, delimiter, chunk_size, backend, encoding, workers):
+    """
+    Yield the chunks of the byte ranges, of about 'chunk_size' rows each, parsed
+    by 'workers' processes, in file order, keeping at most two ranges per
+    worker in flight.
+    """
+    ranges = _csv_ranges(csv_file, start, chunk_size)
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        for bounds in islice(ranges, workers * 2):
+            pending.append(pool.submit(
+                _csv_read_range, csv_file, *bounds, names, kinds, delimiter, chunk_size, backend, encoding
+            ))
+        while pending:
+            chunks = pending.popleft().result()
+            for bounds in islice(ranges, 1):
+                pending.append(pool.submit(
+                    _csv_read_range, csv_file, *bounds, names, kinds, delimiter, chunk_size, backend, encoding
+                ))
+            yield from chunks
+
+class _HashIndex:
+    """
+    Equality index over a column: value -> row id, or a list of row ids for
+    repeated values.
+    """
+    kind = 'hash'
+
+    def __init__(self, column, storage):
+        started = time.perf_counter()
+        self.column = column
+        self._rows = 0
+        self._map = {}
+        for value in storage.tolist() if _is_numpy(storage) else storage:
+            self.add(value, self._rows)
+        self.build_time = time.perf_counter() - started
+
+    def prepare(self, value):
+        """
+        Raise (TypeError) if 'value' cannot be added, before anything changes.
+        """
+        hash(value)
+
+    def add(self, value, row, slot=None):
+        hit = self._map.get(value, _MISSING)
+        if hit is _MISSING:
+            self._map[value] = row
+        elif type(hit) is list:
+            hit.append(row)
+        else:
+            self._map[value] = [hit, row]
+        self._rows = row + 1
+
+    def get(self, value):
+        hit = self._map.get(value, _MISSING)
+        if hit is _MISSING:
+            return []
+        return hit[:] if type(hit) is list else [hit]
+
+    def memory(self):
+        total = sys.getsizeof(self._map)
+        for hit in self._map.values():
+            if type(hit) is list:
+                total += sys.getsizeof(hit) + sum(map(sys.getsizeof, hit))
+            else:
+                total += sys.getsizeof(hit)
+        return total
+
+    def stats(self):
+        return {
+            'column': self.column, 'kind': self.kind, 'rows': self._rows,
+            'keys': len(self._map), 'build_time': self.build_time, 'memory': self.memory()
+        }
+
+class _SortedIndex:
+    """
+    Range index over a column: its non-None values in sorted order next to
+    their row ids. Appends of values not below the maximum are O(1).
+    """
+    kind = 'sorted'
+
+    def __init__(self, column, storage):
+        started = time.perf_counter()
+        self.column = column
+        values = storage.tolist() if _is_numpy(storage) else storage
+        order = sorted(
+            (row for row, value in enumerate(values) if value is not None),
+            key=values.__getitem__
+        )
+        self._keys = [values[row] for row in order]
+        self._ids = array('q', order)
+        self._rows = len(values)
+        self.build_time = time.perf_counter() - started
+
+    def prepare(self, value):
+        """
+        Insert position of 'value' (None: not indexed); raises TypeError for a
+        value not comparable with the keys, before anything changes.
+        """
+        if value is None:
+            return None
+        if not self._keys or not value < self._keys[-1]:
+            return len(self._keys)
+        return bisect_right(self._keys, value)
+
+    def add(self, value, row, slot=_MISSING):
+        if slot is _MISSING:
+            slot = self.prepare(value)
+        self._rows = row + 1
+        if slot is None:
+            return
+        self._keys.insert(slot, value)
+        self._ids.insert(slot, row)
+
+    def get(self, value):
+        return self.range(value, value)
+
+    def range(self, low=None, high=None, include_low=True, include_high=True):
+        """
+        Row ids (ascending) whose value lies between 'low' and 'high'; None
+        leaves that side open.
+        """
+        start = 0 if low is None else (bisect_left if include_low else bisect_right)(self._keys, low)
+        end = len(self._keys) if high is None else (bisect_right if include_high else bisect_left)(self._keys, high)
+        return sorted(self._ids[start:end]) if start < end else []
+
+    def memory(self):
+        seen, total = set(), sys.getsizeof(self._keys) + sys.getsizeof(self._ids)
+        for key in self._keys:
+            if id(key) not in seen:
+                seen.add(id(key))
+                total += sys.getsizeof(key)
+        return total
+
+    def stats(self):
+        return {
+            'column': self.column, 'kind': self.kind, 'rows': self._rows,
+            'keys': len(self._keys), 'build_time': self.build_time, 'memory': self.memory()
+        }
+
+_INDEXES = {'hash': _HashIndex, 'sorted': _SortedIndex}
+
+def _lookup(indexes, column, op, value):
+    """
+    Row ids for a 'where' condition answered from an index of the column, or
+    None when no index applies.
+    """
+    hashed, ordered = indexes.get((column, 'hash')), indexes.get((column, 'sorted'))
+    try:
+        if op == '==' and (hashed or (ordered and value is not None)):
+            return (hashed or ordered).get(value)
+        if op == 'in' and hashed:
+            return sorted(set().union(*map(hashed.get, value)))
+        if ordered and op in ('<', '<=', '>', '>=') and value is not None:
+            if op[0] == '<':
+                return ordered.range(high=value, include_high=op == '<=')
+            return ordered.range(low=value, include_low=op == '>=')
+    except TypeError:
+        return None
+    return None
+
+def _shape_mismatch(data, start=0):
+    """
+    Index of the first row (from 'start') that is not a dict with the keys of
+    the first row, or None.
+    """
+    if not data:
+        return None
+    if not isinstance(data[0], dict):
+        return 0
+    keys = data[0].keys()
+    for index in range(max(start, 1), len(data)):
+        row = data[index]
+        if not isinstance(row, dict) or row.keys() != keys:
+            return index
+    return None
+
+def _schema_mismatch(names, types):
+    """
+    Mismatch finder for rows with exactly the 'names' keys, each value of an
+    allowed type (types: name -> set of types).
+    """
+    checks = [(name, types[name]) for name in names]
+    width = len(names)
+    def mismatch(data, start=0):
+        for index in range(start, len(data)):
+            row = data[index]
+            if not isinstance(row, dict) or len(row) != width:
+                return index
+            for name, allowed in checks:
+                if type(row.get(name, _MISSING)) not in allowed:
+                    return index
+        return None
+    return mismatch
+
+_DTYPE_TYPES = {'int': int, 'float': float, 'bool': bool, 'str': str}
+
+def _column_types(storage, dtype, length):
+    """
+    Python types of the values of a column: known from a typed dtype, scanned
+    for an 'object' column.
+    """
+    if not length:
+        return frozenset()
+    if dtype in _DTYPE_TYPES:
+        return frozenset((_DTYPE_TYPES[dtype],))
+    return frozenset(map(type, _values(storage, dtype)))
+
+def _infer_types(data, names):
+    return {
+        name: frozenset(map(type, map(operator.itemgetter(name), data)))
+        for name in names
+    }
+
+_MAGIC = b'UTBL\x00\x01\x00\x00'
+_TRAILER = struct.Struct('<Q8s')
+
+def _pad(file):
+    offset = file.tell()
+    if offset % 8:
+        file.write(b'\x00' * (8 - offset % 8))
+    return file.tell()
+
+def _stats(values):
+    """
+    [min, max] of the non-None (and non-NaN) values, or None.
+    """
+    values = [value for value in values if value is not None and value == value]
+    try:
+        return [min(values), max(values)] if values else None
+    except TypeError:
+        return None
+
+def _codes_format(size):
+    for code, limit in (('b', 2 ** 7), ('h', 2 ** 15), ('i', 2 ** 31)):
+        if size < limit:
+            return code
+    return 'q'
+
+def _save_columnar(file_name, columns, dtypes, length, row_group_size):
+    """
+    Write columns in the columnar file format: each column is one buffer,
+    8-byte aligned, then a JSON footer, its length and the magic again.
+
+    - bool/int/float columns are stored as raw native arrays ('b', 'q', 'd');
+    - columns of strings (and None) as codes into one JSON dictionary, -1 for None;
+    - anything else as one JSON array per row group.
+    Every column records [min, max] per row group of 'row_group_size' rows.
+    The file is written next to the target and renamed over it, so tables
+    still mapped from the old file keep reading its (unlinked) contents.
+    """
+    directory, base = os.path.split(os.path.abspath(file_name))
+    descriptor, temporary = tempfile.mkstemp(prefix=f'.{base}.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            _write_columnar(file, columns, dtypes, length, row_group_size)
+        try:
+            mode = stat.S_IMODE(os.stat(file_name).st_mode)
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(temporary, mode)
+        os.replace(temporary, file_name)
+    except BaseException:
+        try:
+            os.remove(temporary)
+        except FileNotFoundError:
+            pass
+        raise
+
+def _write_columnar(file, columns, dtypes, length, row_group_size):
+    groups = [(start, min(start + row_group_size, length)) for start in range(0, length, row_group_size)]
+    footer = {
+        'version': 1, 'rows': length, 'byteorder': sys.byteorder,
+        'row_groups': [end - start for start, end in groups], 'columns': []
+    }
+    file.write(_MAGIC)
+    for name, storage in columns.items():
+        dtype = dtypes[name]
+        values = _values(storage, dtype)
+        meta = {'name': name, 'dtype': dtype}
+        meta['stats'] = [_stats(values[start:end]) for start, end in groups]
+        if dtype in _ARRAY_CODES:
+            buffer = array(_ARRAY_CODES[dtype], values)
+            meta.update(encoding='plain', format=buffer.typecode, offset=_pad(file))
+            file.write(buffer.tobytes())
+        elif all(type(value) is str or value is None for value in values):
+            dictionary = list(dict.fromkeys(value for value in values if value is not None))
+            positions = {value: position for position, value in enumerate(dictionary)}
+            positions[None] = -1
+            codes = array(_codes_format(len(dictionary)), map(positions.__getitem__, values))
+            blob = json.dumps(dictionary).encode()
+            meta.update(encoding='dict', format=codes.typecode, offset=_pad(file))
+            file.write(codes.tobytes())
+            meta['dictionary'] = [file.tell(), len(blob)]
+            file.write(blob)
+        else:
+            meta['encoding'] = 'json'
+            meta['blobs'] = []
+            for start, end in groups:
+                blob = json.dumps(values[start:end]).encode()
+                meta['blobs'].append([file.tell(), len(blob)])
+                file.write(blob)
+        footer['columns'].append(meta)
+    blob = json.dumps(footer).encode()
+    file.write(blob)
+    file.write(_TRAILER.pack(len(blob), _MAGIC))
+
+def _prune(footer, conditions):
+    """
+    Row groups that may hold rows matching every (column, op, value)
+    condition, judging by each group's [min, max] stats.
+    """
+    keep = list(range(len(footer['row_groups'])))
+    metas = {meta['name']: meta for meta in footer['columns']}
+    for column, op, value in conditions:
+        meta = metas.get(column)
+        if meta is None or callable(op):
+            continue
+        survivors = []
+        for group in keep:
+            stats = meta['stats'][group]
+            try:
+                if stats is None or value is None or _may_match(stats[0], stats[1], op, value):
+                    survivors.append(group)
+            except TypeError:
+                survivors.append(group)
+        keep = survivors
+    return keep
+
+def _may_match(low, high, op, value):
+    if op == '==':
+        return low <= value <= high
+    if op == '<':
+        return low < value
+    if op == '<=':
+        return low <= value
+    if op == '>':
+        return high > value
+    if op == '>=':
+        return high >= value
+    if op == 'in':
+        return any(item is not None and low <= item <= high for item in value)
+    return True
+
+def _ranges(footer, groups):
+    """
+    (first row, end row, first group, end group) runs of consecutive groups.
+    """
+    starts = [0]
+    for rows in footer['row_groups']:
+        starts.append(starts[-1] + rows)
+    runs = []
+    for group in groups:
+        if runs and runs[-1][3] == group:
+            runs[-1][1], runs[-1][3] = starts[group + 1], group + 1
+        else:
+            runs.append([starts[group], starts[group + 1], group, group + 1])
+    return runs
+
+def _read_column(view, meta, runs, rows, swap, backend):
+    """
+    Storage of one column over the given row runs. A plain column read as a
+    single run is a zero-copy view of the buffer (a memoryview, or a NumPy
+    array with backend='numpy'); otherwise the runs are copied together.
+    """
+    encoding = meta['encoding']
+    if encoding == 'json':
+        values = []
+        for start, end, first, last in runs:
+            for offset, size in meta['blobs'][first:last]:
+                values.extend(json.loads(bytes(view[offset:offset + size])))
+        return values
+    code = meta['format']
+    width = array(code).itemsize
+    buffer = view[meta['offset']:meta['offset'] + rows * width].cast(code)
+    if encoding == 'dict':
+        offset, size = meta['dictionary']
+        dictionary = json.loads(bytes(view[offset:offset + size]))
+        dictionary.append(None)
+        codes = buffer
+        if swap:
+            codes = _unmap(buffer)
+            codes.byteswap()
+        values = []
+        for start, end, first, last in runs:
+            values.extend(map(dictionary.__getitem__, codes[start:end]))
+        return values
+    numpy = _numpy() if backend == 'numpy' else None
+    if numpy is not None and not swap:
+        dtype = numpy.dtype(code)
+        parts = [
+            numpy.frombuffer(view, dtype, end - start, meta['offset'] + start * width)
+            for start, end, first, last in runs
+        ]
+        if len(parts) == 1:
+            part = parts[0]
+        else:
+            part = numpy.concatenate(parts) if parts else numpy.empty(0, dtype)
+        return part.astype(bool) if meta['dtype'] == 'bool' else part
+    if len(runs) == 1 and not swap:
+        start, end = runs[0][:2]
+        return buffer[start:end]
+    storage = array(code)
+    for start, end, first, last in runs:
+        storage.frombytes(buffer[start:end].cast('B'))
+    if swap:
+        storage.byteswap()
+    return storage
+
+def _load_columnar(file_name, names=None, conditions=(), mapped=True, backend='array'):
+    """
+    Read a file written by '_save_columnar' into (columns, dtypes, length),
+    reading only the 'names' columns (all by default) and the row groups the
+    conditions' stats do not rule out.
+    """
+    with open(file_name, 'rb') as file:
+        if mapped:
+            view = memoryview(mmap_.mmap(file.fileno(), 0, access=mmap_.ACCESS_READ))
+        else:
+            view = memoryview(file.read())
+    if len(view) < len(_MAGIC) + _TRAILER.size or bytes(view[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError(f"'{file_name}' is not a columnar table file")
+    size, magic = _TRAILER.unpack(view[len(view) - _TRAILER.size:])
+    if magic != _MAGIC:
+        raise ValueError(f"'{file_name}' is truncated")
+    end = len(view) - _TRAILER.size
+    footer = json.loads(bytes(view[end - size:end]))
+    metas = {meta['name']: meta for meta in footer['columns']}
+    names = list(metas) if names is None else list(names)
+    for name in names:
+        if name not in metas:
+            raise KeyError(f"No column '{name}' in '{file_name}'")
+    runs = _ranges(footer, _prune(footer, conditions))
+    swap = footer['byteorder'] != sys.byteorder
+    columns, dtypes = {}, {}
+    for name in names:
+        meta = metas[name]
+        columns[name] = _read_column(view, meta, runs, footer['rows'], swap, backend)
+        dtypes[name] = meta['dtype']
+    return columns, dtypes, sum(run[1] - run[0] for run in runs)
@@ -5,6 +5,7 @@ from typed import typed, model, Str, Bool, Maybe, Dict, Union, Enum, Bytes, Int
 from utils.mods.url import Url
 from utils.mods.number import Num
 from utils.mods.json_ import Json
+from utils.mods.helper.json_ import _codec
 from utils.mods.helper.http_ import (
     _make_opener, _apply_params, _normalize_headers, _parse_content, Header
 )
@@ -47,8 +48,7 @@ class http:
         if data is not None:
             if data in Dict:
                 if headers_dict.get("Content-Type", "").startswith("application/json"):
-                    import json as _std_json
-                    data_bytes = _std_json.dumps(data).encode("utf-8")
+                    data_bytes = _codec().dumpb(data)
                 else:
                     data_bytes = urlencode(data).encode("utf-8")
                     headers_dict.setdefault(
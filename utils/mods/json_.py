@@ -1,7 +1,23 @@
 import json as json_
-from typed import typed, Bool, Nill, Any, Int, Float, name, TYPE, Str, Dict, Set, List, Union, Regex, Filter
+import mmap as mmap_
+from typed import typed, Bool, Nill, Any, TYPE, Str, Bytes, Dict, Set, List, Union, Regex, Filter, Maybe, Function
 from utils.mods.path  import path, Path, PathErr
 from utils.mods.number import Nat
+from utils.mods.helper.json_ import (
+    _split, _child, _assign, _ensure,
+    _iter_ndjson, _iter_array, _array_tail,
+    _compile, _get_many, _set_many,
+    _codec, _use_codec, _register_codec, _available_codecs,
+    _validate, _iter_flat, _JsonIndex,
+    _diff, _patch, _LazyJson,
+    _unflat_from, _listify,
+    _replace, _substitute, _glob, _MISSING,
+    _compile_query,
+    _pack, _unpack, _msgpack, _pack_fast, _unpack_fast,
+    _PARSE_CACHE,
+    _canonical, _hash, _tree_hash,
+    _merge
+)
 
 Json = Union(Dict, Set, List)
 Entry = Regex(r'^[a-zA-Z0-9_.-]+$')
@@ -27,37 +43,55 @@ Flat.__null__  = {}
 class JsonErr(Exception): pass
 
 class JsonWrapper:
+    """
+    Lightweight view onto a dict/list: nested access returns another view
+    sharing the same underlying object, so reads and writes walk only the path.
+    Views of one document share a cache of subtree hashes ('json.hash(...,
+    tree=True)'). Cached digests are checked against the shallow contents of
+    their node before reuse, so changes made through plain references, not
+    only through the wrapper, are picked up; only changed containers are
+    rehashed, but every container is still visited.
+    """
+    __slots__ = ("_raw", "_hashes")
+
     def __init__(self, data):
-        self._raw = data
-        self._flat = json.flat(data)
+        super().__setattr__("_raw", data)
+        super().__setattr__("_hashes", {})
+
+    def _view(self, value):
+        view = object.__new__(JsonWrapper)
+        object.__setattr__(view, "_raw", value)
+        object.__setattr__(view, "_hashes", self._hashes)
+        return view
 
     def __getattr__(self, key):
-        if key in self._flat:
-            return self._flat[key]
-        subkeys = {k[len(key)+1:]: v for k, v in self._flat.items() if k.startswith(key + ".")}
-        if subkeys:
-            nested = json.unflat(subkeys)
-            return JsonWrapper(nested)
-        raise AttributeError(f"'{type(self).__name__}' has no attribute '{key}'")
+        if key.startswith("_"):
+            raise AttributeError(f"'{type(self).__name__}' has no attribute '{key}'")
+        try:
+            value = self._raw
+            for step in _split(key):
+                value = _child(value, step)
+        except (KeyError, TypeError):
+            raise AttributeError(f"'{type(self).__name__}' has no attribute '{key}'")
+        if isinstance(value, (dict, list)):
+            return self._view(value)
+        return value
 
     def __setattr__(self, key, value):
         if key.startswith("_"):
             super().__setattr__(key, value)
         else:
-            path_key = key
-            json.set(path_key, value, self._raw)
-            self._flat[path_key] = value
+            keys = _split(key)
+            _assign(_ensure(self._raw, keys[:-1]), keys[-1], value)
 
     def __getitem__(self, key):
         return self._raw[key]
 
     def __setitem__(self, key, value):
         self._raw[key] = value
-        self._flat = json.flat(self._raw)
 
     def __delitem__(self, key):
         del self._raw[key]
-        self._flat = json.flat(self._raw)
 
     def __contains__(self, key):
         return key in self._raw
@@ -83,13 +117,6 @@ class JsonWrapper:
     def __json__(self):
         return self._raw
 
-def _is_valid_json_data(data):
-    try:
-        json_.loads(json_.dumps(data))
-        return True
-    except (TypeError, ValueError):
-        return False
-
 class json:
     def __new__(cls, data=None):
         if hasattr(data, '__json__'):
@@ -98,53 +125,315 @@ class json:
                 return cls.__new__(cls, json_data)
             except Exception as e:
                 raise JsonErr(f"Failed to get JSON data from __json__ method: {e}")
-        if not _is_valid_json_data(data):
-            raise JsonErr(f"Invalid JSON data: {data}")
+        try:
+            _validate(data)
+        except ValueError as e:
+            raise JsonErr(f"Invalid JSON data: {e}")
         if isinstance(data, dict):
             return JsonWrapper(data)
         else:
             return super().__new__(cls)
 
     @typed
-    def read(json_file: Path='') -> Json:
+    def validate(json_data: Any, max_depth: Maybe(Nat)=None, max_size: Maybe(Nat)=None) -> Nill:
+        """
+        Check in one pass, without serializing, that the data is valid JSON, within
+        'max_depth' levels of nesting and 'max_size' values. Errors name the offending path.
+        """
+        try:
+            _validate(json_data, max_depth, max_size)
+        except ValueError as e:
+            raise JsonErr(e)
+
+    @typed
+    def read(json_file: Path='', codec: Maybe(Str)=None) -> Json:
         try:
             if path.is_file(json_file):
-                with open(json_file, 'r') as file:
-                    return json_.load(file)
+                backend = _codec(codec)
+                loads = backend.loads
+                def _load(json_file):
+                    with open(json_file, 'rb') as file:
+                        return loads(file.read())
+                # backends may parse the same file differently: cache per codec
+                return _PARSE_CACHE.read(f"json:{backend.name}", json_file, _load)
             else:
                 raise PathErr(f"path '{json_file}' does not exists or is not a file.")
         except Exception:
             raise JsonErr(f"Could not read json file '{json_file}'.")
 
+    class cache:
+        """
+        Opt-in parse cache shared by 'json.read' and 'yml.read', keyed by
+        (path, inode, mtime_ns, size) with LRU eviction by total file size.
+        In 'copy' mode reads return deep copies; in 'frozen' mode they return
+        shared read-only dicts/lists.
+        """
+        @typed
+        def enable(max_bytes: Nat=64 * 1024 * 1024, mode: Str='copy') -> Nill:
+            try:
+                _PARSE_CACHE.configure(True, max_bytes, mode)
+            except Exception as e:
+                raise JsonErr(e)
+
+        @typed
+        def disable() -> Nill:
+            _PARSE_CACHE.configure(False)
+
+        @typed
+        def clear() -> Nill:
+            _PARSE_CACHE.clear()
+
+        @typed
+        def stats() -> Dict:
+            return _PARSE_CACHE.stats()
+
     @typed
-    def write(json_data: Json={}, output_file: Path='') -> Nill:
+    def write(json_data: Json={}, output_file: Path='', codec: Maybe(Str)=None) -> Nill:
         try:
             with open(output_file, 'w') as file:
                 if isinstance(json_data, Str):
                     file.write(json_data)
                 elif isinstance(json_data, Dict):
-                    json_.dump(json_data, file, indent=5)
+                    file.write(_codec(codec).dumps(json_data, indent=5))
                 else:
                     file.write(str(json_data))
         except Exception:
             raise JsonErr(f"Could not write json data to file '{output_file}'.")
 
     @typed
-    def from_str(json_str: Str) -> Json:
+    def iter(json_file: Path='', skip: Nat=0, check: Any=None, chunk_size: Nat=65536, codec: Maybe(Str)=None, lines: Maybe(Bool)=None) -> Any:
+        """
+        Lazily yield the records of a JSON file: the elements of a top-level array
+        (lines=False), or the lines of a NDJSON (JSON Lines) file (lines=True).
+        By default the format is guessed from the first character, so NDJSON whose
+        records are arrays needs lines=True. Up to 'skip' malformed lines are
+        ignored; 'check' (e.g. Json or Flat) is checked against every record.
+        """
+        if not path.is_file(json_file):
+            raise JsonErr(f"path '{json_file}' does not exists or is not a file.")
+        try:
+            with open(json_file, 'r') as file:
+                if lines is None:
+                    head = file.read(1)
+                    while head and head.isspace():
+                        head = file.read(1)
+                    file.seek(0)
+                    lines = head != '['
+                if not lines:
+                    yield from _iter_array(file, json_.JSONDecoder(), chunk_size, check)
+                else:
+                    yield from _iter_ndjson(file, _codec(codec).loads, skip, check)
+        except Exception as e:
+            raise JsonErr(f"Could not stream json file '{json_file}': {e}") from e
+    stream = iter
+
+    @typed
+    def write_iter(records: Any=(), output_file: Path='', lines: Bool=True, append: Bool=False, codec: Maybe(Str)=None) -> Nat:
+        """
+        Write records one at a time, as NDJSON (lines=True) or as a JSON array.
+        With 'append', records are added to the end of an existing file.
+        Returns the number of records written.
+        """
+        try:
+            dumps = _codec(codec).dumps
+            count = 0
+            if lines:
+                with open(output_file, 'a' if append else 'w') as file:
+                    for record in records:
+                        file.write(dumps(record))
+                        file.write('\n')
+                        count += 1
+                return count
+            sep, reopen = '', False
+            if append and path.is_file(output_file):
+                with open(output_file, 'rb+') as file:
+                    end, has_items = _array_tail(file)
+                    file.truncate(end)
+                sep, reopen = (',' if has_items else ''), True
+            with open(output_file, 'a' if reopen else 'w') as file:
+                if not reopen:
+                    file.write('[')
+                for record in records:
+                    file.write(sep)
+                    file.write(dumps(record))
+                    sep = ','
+                    count += 1
+                file.write(']')
+            return count
+        except Exception as e:
+            raise JsonErr(f"Could not write json records to file '{output_file}': {e}") from e
+
+    @typed
+    def open_lazy(json_file: Path='', depth: Nat=2, sidecar: Bool=True, codec: Maybe(Str)=None) -> Any:
+        """
+        Memory-map a json file and index the byte spans of its first 'depth' levels
+        (deeper levels are indexed on demand). Values are parsed only when read
+        by entry, e.g. 'doc.get("a.b.0")'. The index is persisted to '<file>.idx'
+        and reused while the file is unchanged.
+        """
+        if not path.is_file(json_file):
+            raise JsonErr(f"path '{json_file}' does not exists or is not a file.")
+        try:
+            return _LazyJson(json_file, depth, sidecar, _codec(codec))
+        except Exception as e:
+            raise JsonErr(f"Could not open json file '{json_file}' lazily: {e}")
+
+    @typed
+    def from_str(json_str: Str, codec: Maybe(Str)=None) -> Json:
         try:
-            return json_.loads(json_str)
+            return _codec(codec).loads(json_str)
         except Exception as e:
             raise JsonErr(e)
     loads = from_str
 
     @typed
-    def to_str(json_data: Json) -> Str:
+    def to_str(json_data: Json, codec: Maybe(Str)=None) -> Str:
         try:
-            return json_.dumps(json_data)
+            return _codec(codec).dumps(json_data)
         except Exception as e:
             raise JsonErr(e)
     dumps = to_str
 
+    @typed
+    def from_bytes(json_bytes: Bytes, codec: Maybe(Str)=None) -> Json:
+        try:
+            return _codec(codec).loads(json_bytes)
+        except Exception as e:
+            raise JsonErr(e)
+    loadb = from_bytes
+
+    @typed
+    def to_bytes(json_data: Json, codec: Maybe(Str)=None) -> Bytes:
+        try:
+            return _codec(codec).dumpb(json_data)
+        except Exception as e:
+            raise JsonErr(e)
+    dumpb = to_bytes
+
+    class codec:
+        """
+        Registry of JSON backends. By default the fastest installed one among
+        orjson, ujson and simplejson is used, falling back to the stdlib.
+        """
+        @typed
+        def use(name: Maybe(Str)=None) -> Nill:
+            """
+            Set the global codec; 'None' restores automatic selection.
+            """
+            try:
+                _use_codec(name)
+            except Exception as e:
+                raise JsonErr(e)
+
+        @typed
+        def current() -> Str:
+            return _codec().name
+
+        @typed
+        def available() -> List(Str):
+            return _available_codecs()
+
+        @typed
+        def register(name: Str, loads: Function, dumps: Function, dumpb: Maybe(Function)=None) -> Nill:
+            """
+            Register a custom codec: 'loads' must accept str and bytes, 'dumps' return
+            str (with an optional 'indent' argument) and 'dumpb' return bytes.
+            """
+            try:
+                _register_codec(name, loads, dumps, dumpb)
+            except Exception as e:
+                raise JsonErr(e)
+
+    @typed
+    def pack(json_data: Json, fast: Bool=True) -> Bytes:
+        """
+        Serialize to MessagePack (sets included). Uses 'msgpack' if installed and
+        'fast', else a builtin pure-Python encoder.
+        """
+        try:
+            msgpack = _msgpack() if fast else None
+            if msgpack is not None:
+                return _pack_fast(json_data, msgpack)
+            return _pack(json_data)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def unpack(packed: Any, zero_copy: Bool=False, fast: Bool=True) -> Json:
+        """
+        Deserialize MessagePack from bytes, memoryview or mmap, without copying the
+        buffer. With 'zero_copy', binary values are memoryview slices of it
+        (this uses the builtin decoder).
+        """
+        try:
+            msgpack = _msgpack() if fast and not zero_copy else None
+            if msgpack is not None:
+                return _unpack_fast(packed, msgpack)
+            value, end = _unpack(packed, zero_copy)
+            if end != memoryview(packed).nbytes:
+                raise ValueError("extra data after MessagePack value")
+            return value
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def pack_file(json_data: Json={}, output_file: Path='', fast: Bool=True) -> Nill:
+        try:
+            with open(output_file, 'wb') as file:
+                file.write(json.pack(json_data, fast))
+        except Exception as e:
+            raise JsonErr(f"Could not write packed json to file '{output_file}': {e}")
+
+    @typed
+    def unpack_file(packed_file: Path='', zero_copy: Bool=False, fast: Bool=True) -> Json:
+        """
+        Read a MessagePack file through mmap. With 'zero_copy' the map stays open
+        for as long as the returned binary values reference it.
+        """
+        if not path.is_file(packed_file):
+            raise JsonErr(f"path '{packed_file}' does not exists or is not a file.")
+        try:
+            with open(packed_file, 'rb') as file:
+                buffer = mmap_.mmap(file.fileno(), 0, access=mmap_.ACCESS_READ)
+            if zero_copy:
+                return json.unpack(buffer, zero_copy, fast)
+            with buffer:
+                return json.unpack(buffer, zero_copy, fast)
+        except JsonErr:
+            raise
+        except Exception as e:
+            raise JsonErr(f"Could not read packed json file '{packed_file}': {e}")
+
+    @typed
+    def canonical(json_data: Json) -> Str:
+        """
+        Deterministic encoding: sorted keys, no whitespace, normalized numbers
+        (e.g. '1.0' -> '1', '1e16' -> '10000000000000000', '1e-07' -> '1e-7') and sets as arrays sorted by encoding.
+        """
+        try:
+            return _canonical(json_data)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def hash(json_data: Any, algo: Str='sha256', tree: Bool=False) -> Str:
+        """
+        Hex digest of the canonical encoding, streamed into the hash.
+        With 'tree', a Merkle digest built from per-subtree digests instead: for a
+        'JsonWrapper' these are cached and verified before reuse, so after edits,
+        made through the wrapper or not, only the changed branches are rehashed.
+        """
+        try:
+            if tree:
+                if isinstance(json_data, JsonWrapper):
+                    return _tree_hash(json_data._raw, algo, json_data._hashes)
+                return _tree_hash(json_data, algo)
+            if isinstance(json_data, JsonWrapper):
+                json_data = json_data._raw
+            return _hash(json_data, algo)
+        except Exception as e:
+            raise JsonErr(e)
+
     @typed
     def print(json_data: Json={}, colored: Bool=False, indent: Nat=4) -> Nill:
         if colored:
@@ -166,44 +455,37 @@ class json:
 
     @typed
     def flat(json_data: Json) -> Flat:
-        flat_dict = {}
-        def _flatten(item: Any, parent_key: Str = "") -> Nill:
-            if isinstance(item, Dict):
-                for key, value in item.items():
-                    if not isinstance(key, (Str, Int, Float)):
-                        raise JsonErr(f"Invalid key type encountered: {name(TYPE(key))}. Keys must be strings, integers, or floats.")
-                    str_key = str(key)
-                    new_key = f"{parent_key}.{str_key}" if parent_key else str_key
-                    _flatten(value, new_key)
-            elif isinstance(item, list):
-                for index, value in enumerate(item):
-                    new_key = f"{parent_key}.{index}" if parent_key else str(index)
-                    _flatten(value, new_key)
-            elif isinstance(item, set):
-                for index, value in enumerate(sorted(item, key=str)):
-                    new_key = f"{parent_key}.{index}" if parent_key else str(index)
-                    _flatten(value, new_key)
-            else:
-                if parent_key:
-                    flat_dict[parent_key] = item
         try:
-            _flatten(json_data)
-            return flat_dict
+            return dict(_iter_flat(json_data))
+        except Exception as e:
+            raise JsonErr(f"An unexpected error occurred during flattening: {e}") from e
+
+    @typed
+    def iter_flat(json_data: Json) -> Any:
+        """
+        Lazily yield the (entry, value) leaves of the data, in the order of 'json.flat',
+        with an explicit stack (no recursion limit, no intermediate dict).
+        """
+        try:
+            yield from _iter_flat(json_data)
         except Exception as e:
-            raise JsonErr(f"An unexpected error occurred during flattening: {e}") from e 
+            raise JsonErr(f"An unexpected error occurred during flattening: {e}") from e
 
     @typed
     def unflat(flat_data: Flat={}) -> Json:
-        nested = {}
-        for compound_key, value in flat_data.items():
-            keys = str(compound_key).split('.')
-            current = nested
-            for key in keys[:-1]:
-                if key not in current or not isinstance(current[key], Dict):
-                    current[key] = {}
-                current = current[key]
-            current[keys[-1]] = value
-        return nested
+        return _unflat_from(flat_data.items())
+
+    @typed
+    def unflat_from(pairs: Any=(), lists: Bool=False) -> Json:
+        """
+        Build nested data from an iterable of (entry, value) pairs, in any order.
+        With 'lists', objects whose keys are exactly '0'..'n-1' become lists.
+        """
+        try:
+            nested = _unflat_from(pairs)
+            return _listify(nested) if lists else nested
+        except Exception as e:
+            raise JsonErr(e)
 
     @typed
     def has(entry: Entry='', json_data: Json={}) -> Bool:
@@ -265,6 +547,107 @@ class json:
         except Exception as e:
             raise JsonErr(e)
 
+    @typed
+    def path(entry: Entry) -> Any:
+        """
+        Compiled (and cached) accessor for a dot-path, with get/set/delete/exists
+        methods taking the json data. Meant for paths reused in hot loops.
+        """
+        try:
+            return _compile(entry)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def get_many(entries: Union(List(Entry), Dict)=[], json_data: Json={}, std: Any=None) -> Dict:
+        """
+        Get many entries at once, walking shared prefixes only once.
+        'entries' is a list of entries or a dict mapping entries to their defaults.
+        """
+        try:
+            if isinstance(entries, dict):
+                defaults = lambda entry: entries[entry]
+            else:
+                defaults = lambda entry: std
+            return _get_many(json_data, tuple(entries), defaults)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def set_many(mapping: Dict={}, json_data: Json={}) -> Json:
+        """
+        Set many entries (given as an entry -> value dict) in-place, in a single traversal.
+        """
+        try:
+            for entry in mapping:
+                if not isinstance(entry, Entry):
+                    raise JsonErr(f"Invalid entry: '{entry}'")
+            return _set_many(json_data, mapping)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def index(json_data: Json={}) -> Any:
+        """
+        Build an inverted index (value -> entries, entry -> value/type) over the data.
+        Lookups (by_value, has, get, check_type) are O(1); changes made through the
+        index's own set/remove update it incrementally.
+        """
+        try:
+            return _JsonIndex(json_data)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def diff(old: Json={}, new: Json={}, key: Maybe(Str)='id') -> List:
+        """
+        RFC 6902 patch turning 'old' into 'new'. Identical subtrees are skipped, and
+        lists of objects with a unique 'key' field are matched by key, not position.
+        """
+        try:
+            return _diff(old, new, key)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def patch(json_data: Json={}, ops: List=[]) -> Json:
+        """
+        Apply RFC 6902 operations to the data in-place.
+        """
+        try:
+            return _patch(json_data, ops)
+        except Exception as e:
+            raise JsonErr(e)
+
+    @typed
+    def query(expr: Str) -> Any:
+        """
+        Compile (and cache) a JSONPath-like query into a reusable plan, evaluated
+        lazily with 'plan(json_data)', 'plan.items(json_data)', '.all' or '.first'.
+        Supports 'a.b', '*', '..' (recursive descent), '[0]', '[1:5:2]', '["key"]',
+        filters '[?(@.price > 10 && @.tags)]' and a trailing comparison, e.g.
+        'items[*].price > 10'.
+        """
+        try:
+            return _compile_query(expr)
+        except Exception as e:
+            raise JsonErr(f"Invalid query '{expr}': {e}")
+
+    @typed
+    def merge(*docs: Json, strategy: Any=None) -> Json:
+        """
+        Deep-merge documents left to right into a new document, sharing every
+        subtree not changed by later documents. Objects merge key by key; other
+        conflicts follow 'strategy': 'merge' (default, the override wins), 'replace'
+        (also for objects), 'append' (lists are concatenated), 'union' (lists/sets
+        without duplicates), a callable '(base, override, entry) -> value', or a
+        dict mapping entries or globs (e.g. 'plugins', 'tenants.*.tags') to those.
+        """
+        try:
+            return _merge(docs, strategy)
+        except Exception as e:
+            raise JsonErr(e)
+
     class search:
         @typed
         def by_value(value: Any=Nill, json_data: Json={}) -> List(Str):
@@ -353,19 +736,42 @@ class json:
             raise JsonErr(e)
     rm = remove
 
+    @typed
+    def sub(old: Any=Nill, new: Any='', json_data: Json={}, entry: Entry='', glob: Str='') -> Nat:
+        """
+        Replace 'old' (a string or a compiled regex) by 'new' in the string values
+        of the data, in-place, optionally only under 'entry' and/or in entries
+        matching 'glob' ('*': one segment, '**': any). Returns the number of substitutions.
+        """
+        try:
+            if not entry:
+                return _replace(json_data, old, new, '', glob or None)
+            keys = _split(entry)
+            accessor = _compile(entry)
+            parent = accessor._resolve(json_data, accessor._keys[:-1])
+            value = accessor._resolve(json_data, accessor._keys)
+            if value is _MISSING:
+                return 0
+            if isinstance(value, Str):
+                if glob and not _glob(glob)(entry):
+                    return 0
+                value_, count = _substitute(value, old, new)
+                if count:
+                    _assign(parent, keys[-1], value_)
+                return count
+            return _replace(value, old, new, entry, glob or None)
+        except Exception as e:
+            raise JsonErr(e)
+
     @typed
     def replace(entry: Entry='', old: Any=Nill, new: Any=Nill, json_data: Json={}) -> Json:
-        flat_data = json.flat(json_data)
+        """
+        Replace 'old' by 'new' in the string values of the data (or under 'entry'), in-place.
+        """
         if entry:
-            for key, value in flat_data.items():
-                if key == entry:
-                    if type(value) is str:
-                        flat_data[entry] = flat_data[entry].replace(old, new)
-                        return json.unflat(flat_data)
-                    raise TypeError(f"Entry value is not a string: {entry}")
-
-        for key, value in flat_data.items():
-            if type(value) is str:
-                flat_data[key] = flat_data[key].replace(old, new)
-        return json.unflat(flat_data)
+            value = _compile(entry).get(json_data, _MISSING)
+            if value is not _MISSING and not isinstance(value, (Str, Dict, List, Set)):
+                raise TypeError(f"Entry value is not a string: {entry}")
+        json.sub(old, new, json_data, entry)
+        return json_data
     tr = replace
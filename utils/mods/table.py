@@ -1,16 +1,22 @@
-from typed import typed, Any, Str, List, Bool, Filter
+import csv
+import weakref
+from itertools import chain, islice
+from typed import typed, Any, Nill, Str, Int, List, Tuple, Bool, Dict, Union, Maybe, Filter
 from utils.mods.json_ import json, Json
+from utils.mods.path import path, Path
+from utils.mods.number import Nat
+from utils.mods.helper.table import (
+    _numpy, _is_numpy, _infer_dtype, _store, _memory, _values, _item, _append,
+    _copy, _take, _where, _order, _top_k, _group_codes, _aggregate, _AGGREGATES,
+    _join, _JOINS,
+    _csv_delimiter, _csv_kinds, _csv_chunks, _csv_parallel,
+    _INDEXES, _lookup,
+    _shape_mismatch, _schema_mismatch, _column_types, _infer_types,
+    _save_columnar, _load_columnar
+)
 
 def _is_json_table(data: Any) -> Bool:
-    if not isinstance(data, list):
-        return False
-    if not all(isinstance(item, dict) for item in data):
-        return False
-    if data:
-        first_keys = set(data[0].keys())
-        if not all(set(item.keys()) == first_keys for item in data):
-            return False
-    return True
+    return isinstance(data, list) and _shape_mismatch(data) is None
 
 Table = Filter(Json, _is_json_table)
 Table.__display__ = "Table"
@@ -18,7 +24,661 @@ Table.__null__ = {}
 
 class TableErr(Exception): pass
 
+class ColumnTable:
+    """
+    Column-oriented table: each column is stored once, as an 'array.array' for
+    bool/int/float columns (a NumPy array with backend='numpy', when installed)
+    and as a list otherwise, so column and cell access are O(1) and keys are
+    not repeated per row.
+    Secondary indexes built with 'index' are kept up to date by 'append' and
+    'extend' and used by 'where'; writes made directly into a column's storage
+    bypass them.
+    """
+    __slots__ = ("_columns", "_dtypes", "_length", "_backend", "_indexes", "_version", "__weakref__")
+
+    def __init__(self, columns=None, backend='array'):
+        if backend not in ('array', 'numpy', 'list'):
+            raise TableErr(f"Unknown backend: '{backend}'")
+        self._columns = {}
+        self._dtypes = {}
+        self._length = None
+        self._backend = backend
+        self._indexes = {}
+        self._version = 0
+        for name, values in (columns or {}).items():
+            values = list(values)
+            if self._length is None:
+                self._length = len(values)
+            elif len(values) != self._length:
+                raise TableErr(f"Column '{name}' has {len(values)} rows, expected {self._length}")
+            dtype = _infer_dtype(values)
+            self._dtypes[name] = dtype
+            self._columns[name] = _store(values, dtype, backend)
+        if self._length is None:
+            self._length = 0
+
+    @classmethod
+    def from_rows(cls, rows, backend='array'):
+        if not rows:
+            return cls({}, backend)
+        names = list(rows[0])
+        columns = {name: [] for name in names}
+        for position, row in enumerate(rows):
+            if len(row) != len(names):
+                raise TableErr(f"Row {position} does not match the columns {names}")
+            try:
+                for name in names:
+                    columns[name].append(row[name])
+            except KeyError as e:
+                raise TableErr(f"Row {position} has no column {e}")
+        return cls(columns, backend)
+
+    def to_rows(self):
+        names = list(self._columns)
+        columns = [_values(self._columns[name], self._dtypes[name]) for name in names]
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def iter_rows(self):
+        for index in range(self._length):
+            yield self.row(index)
+
+    @property
+    def columns(self):
+        return list(self._columns)
+
+    @property
+    def dtypes(self):
+        return dict(self._dtypes)
+
+    @property
+    def backend(self):
+        return self._backend
+
+    @property
+    def shape(self):
+        return (self._length, len(self._columns))
+
+    def __len__(self):
+        return self._length
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self.column(name)
+
+    def column(self, name):
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise TableErr(f"No column '{name}'")
+
+    def cell(self, index, name):
+        try:
+            return _item(self._columns[name], self._dtypes[name], index)
+        except KeyError:
+            raise TableErr(f"No column '{name}'")
+        except IndexError:
+            raise TableErr(f"Row {index} out of range")
+
+    def row(self, index):
+        if not -self._length <= index < self._length:
+            raise TableErr(f"Row {index} out of range")
+        return {
+            name: _item(storage, self._dtypes[name], index)
+            for name, storage in self._columns.items()
+        }
+
+    def append(self, row):
+        if self._columns and set(row) != set(self._columns):
+            raise TableErr(f"Row does not match the columns {self.columns}")
+        try:
+            slots = [
+                (index, row[name], index.prepare(row[name]))
+                for (name, kind), index in self._indexes.items()
+            ]
+        except TypeError as e:
+            raise TableErr(f"Row cannot be indexed: {e}")
+        if not self._columns:
+            for name, value in row.items():
+                self._dtypes[name] = _infer_dtype((value,))
+                self._columns[name] = _store((), self._dtypes[name], self._backend)
+        for name, value in row.items():
+            self._columns[name], self._dtypes[name] = _append(
+                self._columns[name], self._dtypes[name], value
+            )
+        for index, value, slot in slots:
+            index.add(value, self._length, slot)
+        self._length += 1
+        self._version += 1
+
+    def extend(self, rows):
+        # NumPy arrays cannot grow in place: extend them as lists, converted once
+        rows = iter(rows)
+        if not self._columns:
+            for row in islice(rows, 1):
+                self.append(row)
+        staged = [name for name, storage in self._columns.items() if _is_numpy(storage)]
+        for name in staged:
+            self._columns[name] = self._columns[name].tolist()
+        try:
+            for row in rows:
+                self.append(row)
+        finally:
+            for name in staged:
+                self._columns[name] = _store(self._columns[name], self._dtypes[name], 'numpy')
+
+    @classmethod
+    def _from_storage(cls, columns, dtypes, length, backend):
+        built = object.__new__(cls)
+        built._columns = columns
+        built._dtypes = dtypes
+        built._length = length
+        built._backend = backend
+        built._indexes = {}
+        built._version = 0
+        return built
+
+    def _derive(self, columns, length):
+        dtypes = {name: self._dtypes[name] for name in columns}
+        return ColumnTable._from_storage(columns, dtypes, length, self._backend)
+
+    def _take(self, indices):
+        return self._derive(
+            {name: _take(storage, indices) for name, storage in self._columns.items()},
+            len(indices)
+        )
+
+    def where(self, column, op='==', value=None):
+        """
+        Rows whose 'column' value satisfies 'op' ('==', '!=', '<', '<=', '>', '>=',
+        'in', 'not in' or a predicate callable), tested a column at a time.
+        """
+        try:
+            rows = _lookup(self._indexes, column, op, value) if self._indexes else None
+            if rows is None:
+                rows = _where(self.column(column), op, value)
+            return self._take(rows)
+        except TableErr:
+            raise
+        except Exception as e:
+            raise TableErr(e)
+
+    def select(self, *columns):
+        return self._derive(
+            {name: _copy(self.column(name)) for name in columns},
+            self._length
+        )
+
+    def sort_by(self, *columns, descending=False):
+        """
+        Stable sort by the given columns (the first one is the primary key).
+        """
+        if not columns:
+            raise TableErr("No columns to sort by")
+        try:
+            return self._take(_order([self.column(name) for name in columns], descending))
+        except TableErr:
+            raise
+        except Exception as e:
+            raise TableErr(e)
+
+    def top_k(self, column, k, largest=True):
+        """
+        The k rows with the largest (or smallest) 'column' values, best first,
+        without sorting the whole table.
+        """
+        try:
+            return self._take(_top_k(self.column(column), k, largest))
+        except TableErr:
+            raise
+        except Exception as e:
+            raise TableErr(e)
+
+    def group_by(self, *columns):
+        if not columns:
+            raise TableErr("No columns to group by")
+        return _GroupBy(self, columns)
+
+    def index(self, column, kind='hash'):
+        """
+        Build (or reuse) a secondary index on a column: 'hash' answers '==' and
+        'in' conditions, 'sorted' also '<', '<=', '>' and '>='. The index's
+        'stats()' reports its build time and memory.
+        """
+        if kind not in _INDEXES:
+            raise TableErr(f"Unknown index kind '{kind}', expected one of {tuple(_INDEXES)}")
+        index = self._indexes.get((column, kind))
+        if index is None:
+            try:
+                index = _INDEXES[kind](column, self.column(column))
+            except TableErr:
+                raise
+            except Exception as e:
+                raise TableErr(f"Could not index column '{column}': {e}")
+            self._indexes[(column, kind)] = index
+        return index
+
+    def drop_index(self, column, kind=None):
+        for key in [key for key in self._indexes if key[0] == column and kind in (None, key[1])]:
+            del self._indexes[key]
+
+    @property
+    def indexes(self):
+        return [index.stats() for index in self._indexes.values()]
+
+    def memory(self):
+        """
+        Approximate bytes held by each column, including boxed Python values.
+        """
+        return {name: _memory(storage) for name, storage in self._columns.items()}
+
+    def __repr__(self):
+        columns = ", ".join(f"{name}: {dtype}" for name, dtype in self._dtypes.items())
+        return f"ColumnTable({self._length} rows; {columns})"
+
+class _GroupBy:
+    """
+    Rows of a 'ColumnTable' grouped by key columns, in order of first appearance.
+    Group ids are computed once and shared by every aggregate.
+    """
+    def __init__(self, source, columns):
+        self._source = source
+        self._columns = columns
+        self._codes = None
+        self._keys = None
+
+    def _groups(self):
+        if self._codes is None:
+            storages = [self._source.column(name) for name in self._columns]
+            dtypes = [self._source.dtypes[name] for name in self._columns]
+            self._codes, self._keys = _group_codes(storages, dtypes)
+        return self._codes, self._keys
+
+    def agg(self, **aggregates):
+        """
+        One row per group: the key columns, then one column per keyword, given
+        as output=('column', 'sum|mean|count|min|max') or column='fn'.
+        """
+        codes, keys = self._groups()
+        if len(self._columns) == 1:
+            result = {self._columns[0]: keys}
+        else:
+            result = {name: [key[position] for key in keys] for position, name in enumerate(self._columns)}
+        for output, spec in aggregates.items():
+            column, fn = (output, spec) if isinstance(spec, str) else spec
+            if fn not in _AGGREGATES:
+                raise TableErr(f"Unknown aggregate '{fn}', expected one of {_AGGREGATES}")
+            try:
+                result[output] = _aggregate(self._source.column(column), codes, len(keys), fn)
+            except TableErr:
+                raise
+            except Exception as e:
+                raise TableErr(e)
+        return ColumnTable(result, self._source.backend)
+
+def _columnar(data):
+    """
+    ColumnTable view of a Table, on NumPy columns when NumPy is installed.
+    """
+    if isinstance(data, ColumnTable):
+        return data
+    if isinstance(data, list):
+        try:
+            return ColumnTable.from_rows(data, 'numpy' if _numpy() is not None else 'array')
+        except Exception as e:
+            raise TableErr(e)
+    raise TableErr(f"Expected a Table or ColumnTable, got '{type(data).__name__}'")
+
+def _join_side(data, on):
+    """
+    (length, key) of a join input, the row accessor and its column names.
+    """
+    if isinstance(data, ColumnTable):
+        missing = [name for name in on if name not in data]
+        storages = [data.column(name) for name in on if name in data]
+        row, columns = data.row, data.columns or list(on)
+        if len(storages) == 1:
+            key = lambda index: _item(storages[0], 'object', index)
+        else:
+            key = lambda index: tuple(_item(storage, 'object', index) for storage in storages)
+    elif isinstance(data, list):
+        columns = list(data[0]) if data else list(on)
+        missing = [name for name in on if name not in columns]
+        row = data.__getitem__
+        if len(on) == 1:
+            name = on[0]
+            key = lambda index: data[index][name]
+        else:
+            key = lambda index: tuple(data[index][name] for name in on)
+    else:
+        raise TableErr(f"Expected a Table or ColumnTable, got '{type(data).__name__}'")
+    if missing and len(data):
+        raise TableErr(f"Join columns {missing} missing from {columns}")
+    return (len(data), key), row, columns
+
+def _joined(left, right, on, how, suffix):
+    (left_side, left_row, left_columns) = _join_side(left, on)
+    (right_side, right_row, right_columns) = _join_side(right, on)
+    extra = {
+        name: name + suffix if name in left_columns else name
+        for name in right_columns if name not in on
+    }
+    try:
+        for left_index, right_index in _join(left_side, right_side, how):
+            if left_index is None:
+                row = dict.fromkeys(left_columns)
+                source = right_row(right_index)
+                for name in on:
+                    row[name] = source[name]
+            else:
+                row = dict(left_row(left_index))
+                source = right_row(right_index) if right_index is not None else None
+            for name, output in extra.items():
+                row[output] = source[name] if source is not None else None
+            yield row
+    except Exception as e:
+        raise TableErr(e)
+
+class TableSchema:
+    """
+    Column names and the Python types allowed in each column. 'check' on a
+    Table makes a single pass that stops at the first bad row. On a
+    ColumnTable it compares column dtypes (scanning only 'object' columns) and
+    remembers the result until the table changes through 'append'/'extend', so
+    repeated checks of an unchanged ColumnTable are O(1).
+    """
+    def __init__(self, types):
+        self.columns = tuple(types)
+        self.types = {
+            name: frozenset(kinds if isinstance(kinds, (tuple, list, set, frozenset)) else (kinds,))
+            for name, kinds in types.items()
+        }
+        self._mismatch = _schema_mismatch(self.columns, self.types)
+        self._valid = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def infer(cls, data):
+        if isinstance(data, ColumnTable):
+            return cls({
+                name: _column_types(data.column(name), data.dtypes[name], len(data))
+                for name in data.columns
+            })
+        if not isinstance(data, list):
+            raise TableErr(f"Expected a Table, got '{type(data).__name__}'")
+        bad = _shape_mismatch(data)
+        if bad is not None:
+            raise TableErr(f"Row {bad} does not have the columns of row 0")
+        names = list(data[0]) if data else []
+        return cls(_infer_types(data, names))
+
+    def _check_columns(self, data):
+        if self._valid.get(data) == data._version:
+            return True
+        if self._bad_column(data) is not None:
+            return False
+        self._valid[data] = data._version
+        return True
+
+    def _bad_column(self, data):
+        if data.columns and set(data.columns) != set(self.columns):
+            return f"columns {data.columns} do not match {list(self.columns)}"
+        for name in data.columns:
+            if not _column_types(data.column(name), data.dtypes[name], len(data)) <= self.types[name]:
+                return f"column '{name}' does not match the schema"
+        return None
+
+    def check(self, data):
+        if isinstance(data, ColumnTable):
+            return self._check_columns(data)
+        return isinstance(data, list) and self._mismatch(data) is None
+
+    def validate(self, data):
+        if isinstance(data, ColumnTable):
+            problem = self._bad_column(data)
+            if problem is not None:
+                raise TableErr(problem)
+            return
+        if not isinstance(data, list):
+            raise TableErr(f"Expected a Table, got '{type(data).__name__}'")
+        bad = self._mismatch(data)
+        if bad is not None:
+            raise TableErr(f"Row {bad} does not match the schema: {data[bad]!r}")
+
+    def __eq__(self, other):
+        return isinstance(other, TableSchema) and self.columns == other.columns and self.types == other.types
+
+    def __repr__(self):
+        columns = ", ".join(
+            f"{name}: {'|'.join(sorted(kind.__name__ for kind in kinds))}"
+            for name, kinds in self.types.items()
+        )
+        return f"TableSchema({columns})"
+
+def _csv_batches(data):
+    """
+    Split what 'table.write_csv' is given (a Table, a ColumnTable, or an
+    iterable of rows and ColumnTables) into ColumnTables and lists of rows.
+    """
+    if isinstance(data, (ColumnTable, dict)):
+        data = [data]
+    rows = []
+    for item in data:
+        if isinstance(item, dict):
+            rows.append(item)
+            if len(rows) >= 65536:
+                yield rows
+                rows = []
+        elif isinstance(item, ColumnTable):
+            if rows:
+                yield rows
+                rows = []
+            yield item
+        else:
+            raise TableErr(f"Expected rows or ColumnTables, got '{type(item).__name__}'")
+    if rows:
+        yield rows
+
 class table:
+    @typed
+    def columnar(table: Table=[], backend: Str='array') -> Any:
+        """
+        Convert a list-of-dicts table to a 'ColumnTable' with inferred column
+        dtypes; backend is 'array', 'numpy' (falls back to 'array') or 'list'.
+        """
+        try:
+            return ColumnTable.from_rows(table, backend)
+        except Exception as e:
+            raise TableErr(e)
+
+    @typed
+    def records(table: Any) -> Table:
+        """
+        Convert a 'ColumnTable' back to its list-of-dicts form.
+        """
+        if not isinstance(table, ColumnTable):
+            raise TableErr(f"Expected a ColumnTable, got '{type(table).__name__}'")
+        return table.to_rows()
+
+    @typed
+    def memory(table: Any) -> Dict:
+        """
+        Approximate bytes held by each column of a 'ColumnTable'.
+        """
+        if not isinstance(table, ColumnTable):
+            raise TableErr(f"Expected a ColumnTable, got '{type(table).__name__}'")
+        return table.memory()
+
+    @typed
+    def where(table: Any, column: Str, op: Any='==', value: Any=None) -> Any:
+        """
+        Filter rows on one column; see 'ColumnTable.where'. Accepts a Table or a
+        ColumnTable and returns a ColumnTable, as do the other query functions.
+        """
+        return _columnar(table).where(column, op, value)
+
+    @typed
+    def select(table: Any, columns: List(Str)) -> Any:
+        return _columnar(table).select(*columns)
+
+    @typed
+    def group_by(table: Any, columns: List(Str)) -> Any:
+        """
+        Group rows by key columns; aggregate with '.agg(total=("x", "sum"), ...)'.
+        """
+        return _columnar(table).group_by(*columns)
+
+    @typed
+    def sort_by(table: Any, columns: List(Str), descending: Bool=False) -> Any:
+        return _columnar(table).sort_by(*columns, descending=descending)
+
+    @typed
+    def join(left: Any, right: Any, on: Union(Str, List(Str)), how: Str='inner', suffix: Str='_right') -> Any:
+        """
+        Lazily yield the joined rows (dicts) of two Tables or ColumnTables on the
+        'on' column(s); how is 'inner', 'left' or 'outer'. Both inputs already
+        sorted by the key are merge-joined in O(1) extra memory, otherwise a hash
+        table is built over the smaller input. None keys never match. Right
+        columns clashing with left ones get 'suffix'.
+        """
+        if how not in _JOINS:
+            raise TableErr(f"Unknown join '{how}', expected one of {_JOINS}")
+        on = [on] if isinstance(on, str) else list(on)
+        _join_side(left, on)
+        _join_side(right, on)
+        return _joined(left, right, on, how, suffix)
+
+    @typed
+    def schema(table: Any) -> Any:
+        """
+        Infer a reusable 'TableSchema' (columns and the types seen in each) of
+        a Table or ColumnTable in one pass.
+        """
+        return TableSchema.infer(table)
+
+    @typed
+    def index(table: Any, column: Str, kind: Str='hash') -> Any:
+        """
+        Build, or reuse, a secondary index of a ColumnTable column; see
+        'ColumnTable.index'. Later 'where' calls on that table use it.
+        """
+        if not isinstance(table, ColumnTable):
+            raise TableErr("Indexes live on a ColumnTable; convert with 'table.columnar' first")
+        return table.index(column, kind)
+
+    @typed
+    def read_csv(csv_file: Path='', chunk_size: Nat=65536, delimiter: Maybe(Str)=None, sample: Nat=1000,
+                 workers: Nat=1, encoding: Str='utf-8', backend: Str='array') -> Any:
+        """
+        Lazily yield a CSV/TSV file (header row first) as ColumnTables of up to
+        'chunk_size' rows. Column types (int/float/bool/str) are inferred once from
+        the first 'sample' rows, numbers only when written plainly (no leading
+        zeros, '_' or surrounding spaces); empty fields are None and fields not
+        matching the inferred type are kept as strings. With workers > 1, byte ranges split at
+        line boundaries are parsed in that many processes (quoted fields must not
+        then contain newlines); chunks still come out in file order.
+        """
+        if not path.is_file(csv_file):
+            raise TableErr(f"path '{csv_file}' does not exists or is not a file.")
+        try:
+            delimiter = _csv_delimiter(csv_file, delimiter)
+            with open(csv_file, 'r', newline='', encoding=encoding) as file:
+                reader = csv.reader(file, delimiter=delimiter)
+                names = next(reader, None)
+                if names is None:
+                    return
+                head = list(islice(reader, sample))
+                kinds = _csv_kinds(head, len(names))
+                if workers > 1:
+                    with open(csv_file, 'rb') as raw:
+                        start = len(raw.readline())
+                    chunks = _csv_parallel(
+                        csv_file, start, names, kinds, delimiter, chunk_size, backend, encoding, workers
+                    )
+                else:
+                    chunks = _csv_chunks(chain(head, reader), names, kinds, chunk_size, backend)
+                for columns, dtypes, length in chunks:
+                    yield ColumnTable._from_storage(columns, dtypes, length, backend)
+        except Exception as e:
+            raise TableErr(f"Could not read csv file '{csv_file}': {e}") from e
+
+    @typed
+    def write_csv(table: Any, output_file: Path='', delimiter: Maybe(Str)=None, header: Bool=True, append: Bool=False) -> Nat:
+        """
+        Stream a Table, a ColumnTable, or any iterable of rows and ColumnTables
+        (e.g. 'table.read_csv' or 'table.join' output) to a CSV/TSV file, None
+        written as an empty field. Returns the number of rows written.
+        """
+        try:
+            count, names = 0, None
+            with open(output_file, 'a' if append else 'w', newline='') as file:
+                writer = csv.writer(file, delimiter=_csv_delimiter(output_file, delimiter))
+                for batch in _csv_batches(table):
+                    if isinstance(batch, ColumnTable):
+                        if names is None:
+                            names = batch.columns
+                        elif batch.columns != names:
+                            raise TableErr(f"Columns {batch.columns} do not match {names}")
+                        rows = zip(*(_values(batch.column(name), batch.dtypes[name]) for name in names))
+                    else:
+                        if names is None:
+                            names = list(batch[0])
+                        rows = ([row[name] for name in names] for row in batch)
+                    if header:
+                        writer.writerow(names)
+                        header = False
+                    writer.writerows(rows)
+                    count += len(batch)
+            return count
+        except TableErr:
+            raise
+        except Exception as e:
+            raise TableErr(f"Could not write csv file '{output_file}': {e}") from e
+
+    @typed
+    def save(table: Any, output_file: Path='', row_group_size: Nat=65536) -> Nill:
+        """
+        Write a Table or ColumnTable in a columnar binary format: one typed
+        buffer per bool/int/float column, dictionary-encoded string columns,
+        and a footer with per-row-group min/max stats used by 'table.load'.
+        """
+        data = _columnar(table)
+        try:
+            _save_columnar(output_file, data._columns, data._dtypes, len(data), max(row_group_size, 1))
+        except Exception as e:
+            raise TableErr(f"Could not save table to '{output_file}': {e}") from e
+
+    @typed
+    def load(table_file: Path='', mmap: Bool=True, columns: Maybe(List(Str))=None,
+             where: List(Tuple)=[], backend: Str='array') -> Any:
+        """
+        Read a file written by 'table.save' as a ColumnTable, with only the given
+        columns. With 'mmap', numeric columns are zero-copy views of the mapped
+        file (read-only until appended to). 'where' conditions, as
+        (column, op, value) tuples, skip the row groups their min/max stats
+        rule out and then filter the remaining rows.
+        """
+        if not path.is_file(table_file):
+            raise TableErr(f"path '{table_file}' does not exists or is not a file.")
+        try:
+            names = columns
+            if names is not None and where:
+                names = list(dict.fromkeys(list(names) + [condition[0] for condition in where]))
+            loaded = ColumnTable._from_storage(
+                *_load_columnar(table_file, names, where, mmap, backend), backend
+            )
+        except Exception as e:
+            raise TableErr(f"Could not load table from '{table_file}': {e}") from e
+        for column, op, value in where:
+            loaded = loaded.where(column, op, value)
+        if columns is not None and loaded.columns != list(columns):
+            loaded = loaded._derive({name: loaded.column(name) for name in columns}, len(loaded))
+        return loaded
+
+    @typed
+    def top_k(table: Any, column: Str, k: Int, largest: Bool=True) -> Any:
+        return _columnar(table).top_k(column, k, largest)
+
     @typed
     def get_row(table: Table=[], row_name: Str='' ) -> List(Any):
         if row_name not in table.keys():
@@ -3,6 +3,7 @@ from typed import *
 from utils.mods.path  import PathErr
 from utils.mods.lib   import lib
 from utils.mods.json_ import Json
+from utils.mods.helper.json_ import _PARSE_CACHE
 
 class YMLErr(Exception): pass
 
@@ -12,9 +13,11 @@ class yml:
         import yaml
         try:
             if os.path.isfile(yml_file):
-                with open(yml_file, 'r') as file:
-                    json_data = yaml.safe_load(file)
-                    return json_data if json_data else {}
+                def _load(yml_file):
+                    with open(yml_file, 'r') as file:
+                        json_data = yaml.safe_load(file)
+                        return json_data if json_data else {}
+                return _PARSE_CACHE.read('yml', yml_file, _load)
             else:
                 raise PathErr(f"path '{yml_file}' does not exist or is not a file.")
         except Exception as e:
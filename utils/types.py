@@ -5,7 +5,7 @@ __all__ = [
     "Cron",
     "HEX", "RGB", "HSL", "CMYK", "HSV", "LAB", "HSVA", "RGBA", "LCH", "Color", "ColorDistance",
     "Env", "Char", "Email",
-    "Json", "Entry", "Table",
+    "Json", "Entry", "Table", "ColumnTable", "TableSchema",
     "Path", "File", "Exists", "Dir", "Mount", "Symlink", "Extension", "PathUrl",
     "Url", "Hostname",
     "Nat", "Num", "Even", "Odd", "Pos", "Neg",
@@ -34,6 +34,8 @@ __lazy__ = {
     "Entry":     ("utils.mods.json_",           "Entry"),
 
     "Table":     ("utils.mods.table",           "Table"),
+    "ColumnTable": ("utils.mods.table",         "ColumnTable"),
+    "TableSchema": ("utils.mods.table",         "TableSchema"),
 
     "Path":      ("utils.mods.path",            "Path"),
     "File":      ("utils.mods.path",            "File"),
@@ -86,7 +88,8 @@ if __lsp__:
     from utils.mods.cron   import Cron
     from utils.mods.color  import HEX, RGB, HSL, CMYK, HSV, LAB, HSVA, RGBA, LCH, Color, ColorDistance
     from utils.mods.envs   import Env
-    from utils.mods.json_  import Json, Entry, Table
+    from utils.mods.json_  import Json, Entry
+    from utils.mods.table  import Table, ColumnTable, TableSchema
     from utils.mods.path   import Path, File, Exists, Dir, Mount, Symlink
     from utils.mods.url    import Url, Hostname
     from utils.mods.number import Nat, Num, Even, Odd, Pos, Neg